@@ -0,0 +1,104 @@
+import pandas as pd
+
+from correlation import top_pairs
+
+TOKEN_BUDGET = 1200
+CHARS_PER_TOKEN = 4   # rough size of a token for English text and numbers
+TOP_K = 10
+
+# question keywords -> section they are about
+INTENTS = {
+    "portfolio": ("portfolio", "sharpe", "risk", "weight", "allocat", "var", "shortfall", "invest", "loss"),
+    "correlation": ("correlat", "diversif", "pair", "hedge", "together", "related"),
+    "stocks": ("stock", "compan", "best", "worst", "return", "volatil", "perform", "drawdown", "price", "trend"),
+    "period": ("date", "period", "when")
+}
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _interleave(*groups):
+    """a1, b1, a2, b2, ... so truncating the list keeps both ends of a ranking"""
+    out = []
+    for i in range(max((len(g) for g in groups), default=0)):
+        out.extend(g[i] for g in groups if i < len(g))
+    return out
+
+
+def _stock_line(row):
+    return (f'{row["Company"]}: price {row["Start Price"]:.2f} -> {row["End Price"]:.2f}, '
+            f'return {row["Total Return %"]:.1f}%, vol {row["Volatility"]:.4f}, '
+            f'sharpe {row["Sharpe Ratio"]:.3f}, max dd {row["Max Drawdown %"]:.1f}%')
+
+
+class AdvisorContext:
+    """
+    Compact dashboard summary for the Smart Advisor. Sections are built
+    once per data change as ranked lines (most informative first);
+    for_question() picks sections by intent and keeps lines until the
+    token budget is spent, so prompt size no longer grows with N or N².
+    """
+
+    def __init__(self, stats_df, corr, portfolio_metrics=None, weights=None, period=None, k=TOP_K):
+        self.sections = {}
+
+        ranked = stats_df.dropna(subset=["Sharpe Ratio"]).sort_values("Sharpe Ratio", ascending=False)
+        best = [f"best #{i + 1} {_stock_line(r)}" for i, (_, r) in enumerate(ranked.head(k).iterrows())]
+        # bottom k, leaving out companies already listed as best
+        bottom = ranked.iloc[max(len(ranked) - k, k):][::-1]
+        worst = [f"worst #{i + 1} {_stock_line(r)}" for i, (_, r) in enumerate(bottom.iterrows())]
+        self.sections["stocks"] = [
+            f"STOCKS ({len(stats_df)} selected, ranked by Sharpe):",
+            f'avg return {stats_df["Total Return %"].mean():.1f}%, avg vol {stats_df["Volatility"].mean():.4f}'
+        ] + _interleave(best, worst)
+
+        if len(corr) > 1:
+            pairs = len(corr) * (len(corr) - 1) // 2
+            high = top_pairs(corr, k)
+            low = top_pairs(corr, min(k, max(pairs - k, 0)), lowest=True)  # no pair listed twice
+            values = corr.to_numpy(dtype=float)
+            mean_corr = (values.sum() - values.trace()) / (len(values) * (len(values) - 1))
+            self.sections["correlation"] = [
+                f"CORRELATIONS (daily log returns, mean pairwise {mean_corr:.2f}):"
+            ] + _interleave(
+                [f'most: {a} / {b} {c:.2f}' for a, b, c in high.itertuples(index=False)],
+                [f'least: {a} / {b} {c:.2f}' for a, b, c in low.itertuples(index=False)]
+            )
+
+        if portfolio_metrics:
+            lines = ["PORTFOLIO:"] + [f"{name}: {value}" for name, value in portfolio_metrics.items()]
+            if weights is not None:
+                top = pd.Series(weights).nlargest(k)
+                lines.append("top holdings: " + ", ".join(f"{name} {w:.0%}" for name, w in top.items()))
+            self.sections["portfolio"] = lines
+
+        if period is not None:
+            start, end, days = period
+            self.sections["period"] = [f"PERIOD: {start} to {end}, {days} trading days"]
+
+    def relevant(self, question):
+        """Section names ordered by how many of the question's keywords they match"""
+        q = question.lower()
+        hits = {name: sum(word in q for word in INTENTS.get(name, ())) for name in self.sections}
+        return sorted(self.sections, key=lambda name: -hits[name]), {n for n, h in hits.items() if h}
+
+    def for_question(self, question, budget=TOKEN_BUDGET):
+        order, matched = self.relevant(question)
+        # matched sections share most of the budget; with no match all share equally
+        weights = {n: (3 if n in matched else 1) if matched else 1 for n in order}
+        total = sum(weights.values())
+        parts, spare = [], 0
+        for name in order:
+            allowance = budget * weights[name] / total + spare
+            used, kept = 0, []
+            for line in self.sections[name]:
+                cost = estimate_tokens(line)
+                if used + cost > allowance and kept:
+                    break
+                kept.append(line)
+                used += cost
+            parts.append("\n".join(kept))
+            spare = max(allowance - used, 0)
+        return "\n\n".join(parts)
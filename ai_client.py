@@ -0,0 +1,227 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_URL = os.environ.get("OPENROUTER_URL", "https://openrouter.ai/api/v1/chat/completions")
+DEFAULT_MODEL = "meta-llama/llama-3-8b-instruct"
+CACHE_FILE = os.environ.get("AI_CACHE_FILE", ".ai_cache.sqlite")
+
+
+class StreamError(Exception):
+    """A streamed completion failed; whatever was yielded before it is incomplete"""
+
+
+class ResponseCache:
+    """
+    Persistent SQLite cache of completions keyed by a hash of model + messages.
+    Entries expire after ttl seconds; least recently used entries are evicted
+    once the cache holds more than max_entries or max_bytes of text.
+    """
+
+    def __init__(self, path=CACHE_FILE, ttl=24 * 3600, max_entries=5000, max_bytes=50 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._conn.commit()
+
+    @staticmethod
+    def key(model, messages):
+        payload = json.dumps({"model": model, "messages": messages}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key, response):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, response, len(response.encode("utf-8")), now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        count, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and size <= self.max_bytes:
+            return
+        # walk from least recently used until both limits hold again
+        drop = []
+        for key, entry_size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            if count <= self.max_entries and size <= self.max_bytes:
+                break
+            drop.append((key,))
+            count -= 1
+            size -= entry_size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", drop)
+
+
+class OpenRouterClient:
+    """Pooled keep-alive OpenRouter client with timeouts, retries and a response cache"""
+
+    def __init__(self, api_key, model=DEFAULT_MODEL, url=API_URL, timeout=(5, 60),
+                 retries=3, backoff=0.5, pool_size=10, cache=None):
+        self.model = model
+        self.url = url
+        self.timeout = timeout
+        self.cache = cache
+        self.pool_size = pool_size
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"POST"}),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "HTTP-Referer": "https://stock-portfolio-analyzer.streamlit.app",
+            "X-Title": "Stock Portfolio Analyzer",
+            "Content-Type": "application/json"
+        })
+
+    def chat(self, messages, model=None, use_cache=True):
+        """Completion text for a message list; errors come back as "API Error: ..." text"""
+        model = model or self.model
+        key = ResponseCache.key(model, messages)
+        if use_cache and self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        try:
+            response = self.session.post(
+                self.url,
+                json={"model": model, "messages": messages},
+                timeout=self.timeout
+            )
+            result = response.json()
+        except (requests.RequestException, ValueError) as e:
+            return f"API Error: {e}"
+
+        if "error" in result:
+            return f"API Error: {result['error']}"
+
+        content = result["choices"][0]["message"]["content"]
+        if self.cache is not None:
+            self.cache.put(key, content)
+        return content
+
+    def stream_chat(self, messages, model=None, use_cache=True, cancel=None):
+        """
+        Yield the completion as text deltas from the server-sent event stream.
+        Stops early once cancel (a threading.Event) is set or the generator is
+        closed; only complete answers are cached. Failures raise StreamError
+        ("API Error: ...") instead of being yielded, so callers can tell a
+        failed or partial answer from a complete one.
+        """
+        model = model or self.model
+        key = ResponseCache.key(model, messages)
+        if use_cache and self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        try:
+            response = self.session.post(
+                self.url,
+                json={"model": model, "messages": messages, "stream": True},
+                timeout=self.timeout,
+                stream=True
+            )
+        except requests.RequestException as e:
+            raise StreamError(f"API Error: {e}") from e
+
+        parts = []
+        done = False
+        try:
+            if response.status_code != 200:
+                try:
+                    error = response.json().get("error", response.text)
+                except ValueError:
+                    error = response.text
+                raise StreamError(f"API Error: {error}")
+            response.encoding = "utf-8"  # SSE is UTF-8 even without a charset header
+            # chunk_size=None yields each chunk of the streamed body as it arrives instead of waiting for 512 bytes
+            for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                if cancel is not None and cancel.is_set():
+                    return
+                # blank lines separate events, ":" lines are keep-alive comments
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    done = True
+                    break
+                event = json.loads(data)
+                if "error" in event:
+                    raise StreamError(f"API Error: {event['error']}")
+                delta = event["choices"][0].get("delta", {}).get("content")
+                if delta:
+                    parts.append(delta)
+                    yield delta
+            else:
+                done = True
+        except (requests.RequestException, ValueError, KeyError, IndexError, TypeError) as e:
+            # dropped connection, bad JSON or an event without choices
+            raise StreamError(f"API Error: {e!r}") from e
+        finally:
+            response.close()  # also runs on cancel / generator close, dropping the connection
+
+        if done and parts and self.cache is not None:
+            self.cache.put(key, "".join(parts))
+
+    def chat_many(self, message_lists, model=None, max_workers=None):
+        """Run several completions concurrently over the shared pool, results in input order"""
+        with ThreadPoolExecutor(max_workers=max_workers or self.pool_size) as pool:
+            return list(pool.map(lambda messages: self.chat(messages, model), message_lists))
+
+    async def achat(self, messages, model=None, use_cache=True):
+        return await asyncio.to_thread(self.chat, messages, model, use_cache)
+
+    async def achat_many(self, message_lists, model=None):
+        return await asyncio.gather(*(self.achat(messages, model) for messages in message_lists))
@@ -1,42 +1,48 @@
-import requests
 import os
+import threading
 import streamlit as st
+from ai_client import OpenRouterClient, ResponseCache
+from timing import timed
+
+SYSTEM_PROMPT = "You are a helpful financial assistant. Explain stock charts, portfolio stats and market concepts in simple language.Answer is 5 lines when  possible."
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """One pooled client per process, secrets are read only once"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            try:
+                api_key = st.secrets["OPENROUTER_API_KEY"]
+            except (KeyError, FileNotFoundError):
+                api_key = os.environ.get("OPENROUTER_API_KEY", "")
+            _client = OpenRouterClient(api_key, cache=ResponseCache())
+    return _client
+
+def _messages(prompt):
+    return [
+        {
+            "role": "system",
+            "content": SYSTEM_PROMPT
+        },
+        {
+            "role": "user",
+            "content": prompt
+        }
+    ]
+
+@timed
 def ask_ai(prompt):
+    return get_client().chat(_messages(prompt))
 
-    api_key = st.secrets["OPENROUTER_API_KEY"]
-
-    url = "https://openrouter.ai/api/v1/chat/completions"
-
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "HTTP-Referer": "https://stock-portfolio-analyzer.streamlit.app",
-        "X-Title": "Stock Portfolio Analyzer",
-        "Content-Type": "application/json"
-    }
-
-    data = {
-        "model": "meta-llama/llama-3-8b-instruct",
-        "messages": [
-            {
-                "role": "system",
-                "content": "You are a helpful financial assistant. Explain stock charts, portfolio stats and market concepts in simple language.Answer is 5 lines when  possible."
-            },
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ]
-    }
-
-    response = requests.post(url, headers=headers, json=data)
-    result = response.json()
-
-    if "error" in result:
-        return f"API Error: {result['error']}"
-
-    return result["choices"][0]["message"]["content"]
-def chart_insight(chart_title, data_summary):
-    prompt = f"""
+def stream_ai(prompt, cancel=None):
+    """ask_ai as a generator of text deltas, stopped early when cancel is set; raises StreamError on failure"""
+    return get_client().stream_chat(_messages(prompt), cancel=cancel)
+
+def _chart_insight_prompt(chart_title, data_summary):
+    return f"""
 You are a stock market analyst.
 
 Give ONLY 2–3 short bullet insights from the data.
@@ -58,11 +64,17 @@ Chart: {chart_title}
 Data Summary:
 {data_summary}
 """
-    return ask_ai(prompt)
+
+@timed
+def chart_insight(chart_title, data_summary):
+    return ask_ai(_chart_insight_prompt(chart_title, data_summary))
+
+def stream_chart_insight(chart_title, data_summary, cancel=None):
+    return stream_ai(_chart_insight_prompt(chart_title, data_summary), cancel)
 # ================= SMART ADVISOR (RAG) =================
 
-def ask_dashboard_question(user_question, dashboard_context, chat_history):
-    prompt = f"""
+def _dashboard_prompt(user_question, dashboard_context, chat_history):
+    return f"""
 You are a professional financial advisor helping a user understand their stock dashboard.
 
 You have 3 knowledge sources:
@@ -89,4 +101,9 @@ Rules:
 Answer:
 """
 
-    return ask_ai(prompt)
\ No newline at end of file
+@timed
+def ask_dashboard_question(user_question, dashboard_context, chat_history):
+    return ask_ai(_dashboard_prompt(user_question, dashboard_context, chat_history))
+
+def stream_dashboard_question(user_question, dashboard_context, chat_history, cancel=None):
+    return stream_ai(_dashboard_prompt(user_question, dashboard_context, chat_history), cancel)
\ No newline at end of file
@@ -1,39 +1,56 @@
 import streamlit as st
-import json
-import os
-from yfinance import Search
-from config import MARKETS
-from data import fetch_prices, stock_statistics, compute_portfolio
-from charts import compare_price_chart, correlation_heatmap, portfolio_chart
+from company_search import remote_search
+from company_store import get_store
+from universe import get_universe
+from config import MARKETS, PRICE_DTYPE, BENCHMARKS, REBALANCE_POLICIES, ADVISOR_HISTORY_TURNS
+from data import stock_statistics, compute_portfolio, evaluate_portfolios, mean_variance, optimize_portfolio, efficient_frontier, portfolio_risk_score
+from panel_store import shared_panel, select_named
+from price_cache import REFRESH_SECONDS
+from charts import compare_price_chart, correlation_heatmap, portfolio_chart, efficient_frontier_chart, top_pairs_chart, rolling_metric_chart, simulation_fan_chart, timing_waterfall_chart
+from correlation import top_pairs
+from rolling import rolling_volatility, rolling_sharpe, rolling_beta, rolling_correlation
+from optimizer import random_portfolios, DEFAULT_SAMPLES
+from returns_panel import ReturnsPanel
+from backtest import backtest
+from risk import risk_report, component_var
+from advisor_context import AdvisorContext
+from simulation import simulate_growth, DEFAULT_PATHS
 import plotly.express as px
 import pandas as pd
 import numpy as np
 
-from ai_utils import chart_insight, ask_ai
+from ai_client import StreamError
+from ai_utils import stream_ai, stream_chart_insight, get_client
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+import queue
+import threading
+import uuid
+from timing import start_rerun, stage
 
 if "insights_cache" not in st.session_state:
     st.session_state.insights_cache = {}
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = {}
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+timer = start_rerun(st.session_state.session_id) # per-stage timings of this rerun
+# a rerun stops the previous run's AI streams, its placeholders are gone anyway
+if "cancel_streams" in st.session_state:
+    st.session_state.cancel_streams.set()
+st.session_state.cancel_streams = cancel_streams = threading.Event()
 # -----------------------------
 # PAGE CONFIG
 # -----------------------------
 st.set_page_config(page_title="Stock Portfolio Analyzer", layout="wide")
 st.title("📊 Stock Portfolio Analyzer")
 # -----------------------------
-# PERSISTENCE FILE
+# COMPANY UNIVERSE (built once per process, synced with the shared store)
 # -----------------------------
-DATA_FILE = "custom_companies.json"
-if os.path.exists(DATA_FILE):
-    with open(DATA_FILE, "r") as f:
-        persisted_companies = json.load(f)
-else:
-    persisted_companies = {}
+universe = get_universe()
 # -----------------------------
 # SESSION STATE INIT
 # -----------------------------
-if "global_companies" not in st.session_state:
-    st.session_state.global_companies = persisted_companies
 if "selected_companies" not in st.session_state:
     st.session_state.selected_companies = []
 if "selected_market" not in st.session_state:
@@ -42,6 +59,7 @@ if "selected_market" not in st.session_state:
 # SIDEBAR CONTROLS (NEW)
 # -----------------------------
 
+show_timings = st.sidebar.checkbox("Developer timings", value=False)
 st.sidebar.header("Portfolio Universe")
 
 # 1️⃣ MULTI MARKET SELECTION
@@ -56,13 +74,9 @@ if not selected_markets:
     st.stop()
 
 # 2️⃣ GET ALL SECTORS FROM SELECTED MARKETS
-available_sectors = []
-for m in selected_markets:
-    available_sectors.extend(MARKETS[m].keys())
-
 selected_sectors = st.sidebar.multiselect(
     "Select Sectors",
-    sorted(list(set(available_sectors))),
+    universe.sectors_for(selected_markets),
     default=[]
 )
 
@@ -73,21 +87,8 @@ if not selected_sectors:
 # -----------------------------
 # BUILD GLOBAL COMPANY UNIVERSE
 # -----------------------------
-merged_companies = {}
-
-# Add companies from config.py based on selected markets & sectors
-for market in selected_markets:
-    for sector, comps in MARKETS[market].items():
-        if sector in selected_sectors:
-            merged_companies.update(comps)
-
-# Add custom companies (user added)
-for name, info in st.session_state.global_companies.items():
-    if isinstance(info, dict):
-        if info.get("market") in selected_markets and info.get("sector") in selected_sectors:
-            merged_companies[name] = info["ticker"]
-    else:
-        merged_companies[name] = info
+# config.py companies plus custom ones for the selected markets & sectors
+merged_companies = universe.companies_for(selected_markets, selected_sectors)
 
 # -----------------------------
 # COMPANY MULTISELECT (GLOBAL)
@@ -98,49 +99,42 @@ companies = st.sidebar.multiselect(
 )
 st.session_state.selected_companies = companies
 # -----------------------------
-# Add new company by name with Yahoo fallback
+# Add new company: instant local suggestions, Yahoo search only on request
 # -----------------------------
-with st.sidebar.form("add_company_form"):
-    search_name = st.text_input("Add Company")
-    add_clicked = st.form_submit_button("Add Company")
-    if add_clicked and search_name:
-        # Flatten all companies
-        all_companies_flat = {}
-        for m in MARKETS:
-            for sector_dict in MARKETS[m].values():
-                all_companies_flat.update(sector_dict)
-        for name, info in st.session_state.global_companies.items():
-            if isinstance(info, dict):
-                all_companies_flat[name] = info["ticker"]
-            else:
-                all_companies_flat[name] = info
-
-        if search_name in all_companies_flat:
-            ticker = all_companies_flat[search_name]
-            st.success(f"Added {search_name} ({ticker})")
-        else:
-            # Yahoo Finance search fallback
-            result = Search(search_name, max_results=1).quotes
-            if result:
-                name = result[0].get("shortname", search_name)
-                ticker = result[0]["symbol"]
-                st.success(f"Added {name} ({ticker})")
-            else:
-                st.error("Company not found.")
-                name = None
-                ticker = None
-        # Save to JSON with market & sector
-        if name and ticker:
-            st.session_state.global_companies[name] = {
-                "ticker": ticker,
-                "market": market,
-                "sector": sector
-            }
-            with open(DATA_FILE, "w") as f:
-                json.dump(st.session_state.global_companies, f, indent=4)
+search_name = st.sidebar.text_input("Add Company")
+if search_name:
+    suggestions = universe.search_index().search(search_name)
+    # the network call runs on the button press only, never on ordinary reruns
+    if st.sidebar.button("Search Yahoo Finance"):
+        try:
+            st.session_state.remote_results = (search_name, remote_search(search_name))
+        except Exception as e:
+            st.sidebar.error(f"Yahoo Finance search failed: {e}")
+    remote = st.session_state.get("remote_results")
+    searched = remote is not None and remote[0] == search_name
+    if searched:
+        suggestions = list(dict.fromkeys(remote[1] + suggestions))
+    if suggestions:
+        choice = st.sidebar.selectbox(
+            "Matches",
+            range(len(suggestions)),
+            format_func=lambda i: f"{suggestions[i][0]} ({suggestions[i][1]})")
+        add_market = st.sidebar.selectbox("Add to market", selected_markets)
+        add_sector = st.sidebar.selectbox("Add to sector", selected_sectors)
+        if st.sidebar.button("Add Company"):
+            name, ticker = suggestions[choice]
+            # Save with market & sector; every session picks it up on its next sync
+            get_store().add_company(name, ticker, add_market, add_sector)
+            universe = get_universe()
+            merged_companies = universe.companies_for(selected_markets, selected_sectors)
             # Add to selected companies
             if name not in st.session_state.selected_companies:
                 st.session_state.selected_companies.append(name)
+            st.sidebar.success(f"Added {name} ({ticker})")
+    elif searched:
+        st.sidebar.error("Company not found.")
+    else:
+        st.sidebar.caption("No local match, try Search Yahoo Finance.")
 # -----------------------------
 # DATE RANGE
 # -----------------------------
@@ -157,30 +151,96 @@ if not tickers:
 # -----------------------------
 # FETCH DATA
 # -----------------------------
-prices = fetch_prices(tickers, start_date, end_date)
+@st.cache_resource(ttl=REFRESH_SECONDS)
+def load_prices(tickers, start, end, dtype):
+    # cleaned once, then memory-mapped read-only and shared by every session
+    return shared_panel(list(tickers), start, end, dtype)
+
+with stage("load prices"):
+    prices = load_prices(tuple(dict.fromkeys(tickers)), start_date, end_date, PRICE_DTYPE)
 # -----------------------------
 # RENAME COLUMNS TO COMPANY NAMES & HANDLE MISSING DATA
 # -----------------------------
-ticker_to_name = {v: k for k, v in merged_companies.items()}
-prices_named = prices.rename(columns=ticker_to_name)
-prices_named = prices_named.dropna(axis=1, how="all")
-prices_named = prices_named.apply(pd.to_numeric, errors="coerce")
-prices_named = prices_named.ffill().bfill() # forward fill missing prices
+# one column per selected name, so companies sharing a ticker each keep theirs
+named = [c for c in st.session_state.selected_companies if merged_companies.get(c) in prices.columns]
+prices_named = select_named(prices, [merged_companies[c] for c in named], named)
+panel = ReturnsPanel(prices_named) # returns / moments computed once per rerun
+
+@st.cache_resource
+def insight_pool():
+    # shared by every session in this process
+    return ThreadPoolExecutor(max_workers=16)
+
+pending_insights = {}  # key -> (placeholder, streamed parts) for this rerun
+# (key, delta) from the workers, then (key, None) when a stream completes or (key, exception) when it fails
+insight_tokens = queue.Queue()
+
+def stream_insight(tokens, key, title, summary, cancel):
+    with stage(f"stream insight: {key}"):
+        end = None
+        try:
+            for delta in stream_chart_insight(title, summary, cancel):
+                tokens.put((key, delta))
+            if cancel.is_set():
+                end = StreamError("cancelled")  # stopped early, the text is partial
+        except Exception as e:
+            end = e
+        tokens.put((key, end))
+
+def receive_insight_token():
+    """Apply one streamed delta to its placeholder, blocking until one arrives"""
+    key, delta = insight_tokens.get()
+    placeholder, parts = pending_insights[key]
+    if delta is None or isinstance(delta, Exception):
+        text = "".join(parts)
+        if delta is None and text:
+            st.session_state.insights_cache[key] = text
+            placeholder.info(text)
+        else:
+            # failed, cancelled or empty: nothing is cached, so it is retried on the next rerun
+            placeholder.warning(f"AI insight unavailable right now. {delta or ''}".strip())
+        del pending_insights[key]
+    else:
+        parts.append(delta)
+        placeholder.info("".join(parts) + " ▌")
+
+def get_insight(key):
+    """Insight text for key, rendering any other streams that arrive meanwhile"""
+    while key in pending_insights:
+        receive_insight_token()
+    return st.session_state.insights_cache.get(key, "")
+
+def fill_pending_insights():
+    """Render every insight stream token by token, in whatever order tokens arrive"""
+    while pending_insights:
+        receive_insight_token()
 
 def show_ai_section(key, title, summary):
-    # Generate insight once and cache
-    if key not in st.session_state.insights_cache:
-        st.session_state.insights_cache[key] = chart_insight(title, summary)
-    insight = st.session_state.insights_cache[key]
     st.markdown("#### AI Insight")
-    st.info(insight)
+    placeholder = st.empty()
+    # Generate insight once and cache, in the background so the page keeps rendering
+    if key in st.session_state.insights_cache:
+        placeholder.info(st.session_state.insights_cache[key])
+    elif key not in pending_insights:
+        get_client()  # resolve secrets on the script thread
+        placeholder.info("⏳ Generating insight...")
+        pending_insights[key] = (placeholder, [])
+        # run in a copy of this context so the worker's timings land in this rerun
+        insight_pool().submit(copy_context().run, stream_insight, insight_tokens, key, title, summary, cancel_streams)
     # Chat memory per chart
     if key not in st.session_state.chat_history:
         st.session_state.chat_history[key] = []
     question = st.text_input(
         f"Ask more about {title}",
         key=f"input_{key}")
+    # Show conversation
+    for role, msg in st.session_state.chat_history[key]:
+        if role == "You":
+            st.markdown(f"**You:** {msg}")
+        else:
+            st.markdown(f"**AI:** {msg}")
     if question:
+        insight = get_insight(key)
         # 🔥 FULL CONTEXT PROMPT (THIS IS THE MAGIC)
         full_prompt = f"""
 You are a financial data explanation assistant.
@@ -213,45 +273,49 @@ If a required value is missing, say "not available in data".
 
 Max 5-6 lines total.
 """
-        answer = ask_ai(full_prompt)
-        st.session_state.chat_history[key].append(("You", question))
-        st.session_state.chat_history[key].append(("AI", answer))
-    # Show conversation
-    for role, msg in st.session_state.chat_history[key]:
-        if role == "You":
-            st.markdown(f"**You:** {msg}")
+        st.markdown(f"**You:** {question}")
+        try:
+            answer = st.write_stream(stream_ai(full_prompt, cancel_streams))
+        except StreamError as e:
+            st.error(str(e))  # not added to the history, the question can be asked again
         else:
-            st.markdown(f"**AI:** {msg}")
+            st.session_state.chat_history[key].append(("You", question))
+            st.session_state.chat_history[key].append(("AI", answer))
 # -----------------------------
 # TABS
 # -----------------------------
-tabs = st.tabs(["📈 Charts", "📊 Statistics", "💼 Portfolio"])
+tabs = st.tabs(["📈 Charts", "📊 Statistics", "💼 Portfolio", "📉 Rolling"])
 # ------------------ CHARTS ------------------
-with tabs[0]:
+with tabs[0], stage("tab: charts"):
     st.subheader("Stock Price Comparison")
     chart_stocks = st.multiselect(
         "Select stocks to display in charts",
         list(prices_named.columns),
         default=list(prices_named.columns))
-    chart_df = prices_named[chart_stocks].dropna()
+    chart_panel = panel.select(chart_stocks)
     # normalize ONCE properly
-    normalized_df = chart_df.copy()
-    for col in chart_stocks:
-        normalized_df[col] = (normalized_df[col] / normalized_df[col].iloc[0]) * 100
+    normalized_df = chart_panel.normalized
     st.plotly_chart(
         compare_price_chart(normalized_df, chart_stocks),
         use_container_width=True)
     summary = normalized_df.tail(10).to_string()
     show_ai_section("price_chart", "Stock Price Comparison", summary)
     st.subheader("Correlation Heatmap")
-    st.plotly_chart(correlation_heatmap(prices_named[chart_stocks]),
+    st.plotly_chart(correlation_heatmap(chart_panel),
         use_container_width=True)
-    corr_summary = prices_named[chart_stocks].corr().to_string()
+    # the heatmap and the AI summary share the panel's one correlation matrix
+    pairs_df = top_pairs(chart_panel.corr, k=10)
+    if len(pairs_df):
+        st.plotly_chart(top_pairs_chart(pairs_df), use_container_width=True)
+    corr_summary = (
+        "MOST CORRELATED PAIRS:\n" + pairs_df.to_string(index=False)
+        + "\nLEAST CORRELATED PAIRS:\n" + top_pairs(chart_panel.corr, k=5, lowest=True).to_string(index=False)
+    )
     show_ai_section("correlation", "Stock Correlation Heatmap", corr_summary)
 # ------------------ STATISTICS ------------------
-with tabs[1]:
+with tabs[1], stage("tab: statistics"):
     st.subheader("Stock Statistics")
-    stats_df = stock_statistics(prices_named)
+    stats_df = stock_statistics(panel)
     st.dataframe(stats_df, use_container_width=True)
     stats_summary = stats_df.to_string()
     show_ai_section("stats_table", "Stock Statistics Table", stats_summary)
@@ -270,11 +334,11 @@ with tabs[1]:
     company_for_hist = st.selectbox(
         "Select company for daily returns histogram",
         stats_df["Company"])
-    st.plotly_chart(daily_returns_histogram(prices_named, company_for_hist), use_container_width=True)
+    st.plotly_chart(daily_returns_histogram(panel, company_for_hist), use_container_width=True)
     hist_summary = prices_named[company_for_hist].describe().to_string()
     show_ai_section("histogram", "Daily Returns Histogram", hist_summary)
 # ------------------ PORTFOLIO ------------------
-with tabs[2]:
+with tabs[2], stage("tab: portfolio"):
     st.subheader("Portfolio Construction")
     right_col, left_col = st.columns([1, 2])
     pie_placeholder = right_col.empty()
@@ -334,11 +398,16 @@ with tabs[2]:
         value=100000,
         step=1000
 )
+    r1, r2 = st.columns(2)
+    policy = r1.selectbox("Rebalancing", list(REBALANCE_POLICIES))
+    cost_bps = r2.number_input("Transaction cost (bps)", min_value=0.0, value=10.0, step=1.0)
     portfolio_stats, portfolio_returns = compute_portfolio(
-        prices_named,
+        panel,
         weight_array)
-    # 💰 Portfolio final value simulation
-    final_value = initial_investment * (1 + portfolio_returns).cumprod().iloc[-1]
+    # 💰 Portfolio value simulated with the chosen rebalancing and costs
+    rebalance, threshold = REBALANCE_POLICIES[policy]
+    values, summary = backtest(panel, weight_array, rebalance, threshold, cost_bps, initial=initial_investment)
+    final_value = summary["Final Value"].iloc[0]
     profit_loss = final_value - initial_investment
     return_pct = (profit_loss / initial_investment) * 100
     # 4️⃣ Show metrics
@@ -355,14 +424,32 @@ with tabs[2]:
         "Profit / Loss",
         f"₹{profit_loss:,.2f}"
 )
+    with st.expander("🔮 Forward Simulation"):
+        f1, f2, f3 = st.columns(3)
+        sim_method = f1.selectbox("Return model", ["Normal", "Historical bootstrap"])
+        sim_horizon = f2.slider("Horizon (trading days)", min_value=21, max_value=1260, value=252, step=21)
+        sim_paths = f3.number_input("Paths", min_value=1000, max_value=1_000_000, value=DEFAULT_PATHS, step=10_000)
+        with stage("forward simulation"):
+            bands, sim_summary = simulate_growth(
+                panel, weight_array, sim_horizon, int(sim_paths),
+                "normal" if sim_method == "Normal" else "bootstrap",
+                seed=42, initial=initial_investment)
+        s1, s2, s3 = st.columns(3)
+        s1.metric("Probability of Loss", f'{sim_summary["Probability of Loss"]:.1%}')
+        s2.metric("Median Final Value", f'₹{sim_summary["Median Final Value"]:,.2f}')
+        s3.metric("Mean Final Value", f'₹{sim_summary["Mean Final Value"]:,.2f}')
+        if sim_summary["Zero Volatility"]:
+            st.info("This portfolio's returns have no volatility, so every simulated path is the same line.")
+        st.plotly_chart(simulation_fan_chart(bands), use_container_width=True)
+    with st.expander("Compare rebalancing policies"):
+        rows = []
+        for name, (reb, thr) in REBALANCE_POLICIES.items():
+            _, policy_summary = backtest(panel, weight_array, reb, thr, cost_bps, initial=initial_investment)
+            rows.append(policy_summary.rename(index={policy_summary.index[0]: name}))
+        st.dataframe(pd.concat(rows).style.format({
+            "Final Value": "₹{:,.2f}", "Total Return": "{:.2%}", "Turnover": "{:.2f}", "Costs": "₹{:,.2f}"}))
     # risk score
-    vol = portfolio_stats["Volatility"]
-    sharpe = portfolio_stats["Sharpe Ratio"]
-    vol_score = (vol - 0.005) / (0.03 - 0.005) * 100 #min-max scaling.
-    sharpe_score = (3 - sharpe) / 4 * 100
-    # Final risk score (weighted)
-    risk_score = 0.6 * vol_score + 0.4 * sharpe_score
-    risk_score = np.clip(risk_score, 0, 100)    
+    risk_score = portfolio_risk_score(portfolio_stats)
     st.subheader("📊 Portfolio Risk Score")
     if risk_score < 30:
         st.success(f"Low Risk 🟢 ({risk_score:.2f}/100)")
@@ -370,9 +457,21 @@ with tabs[2]:
         st.warning(f"Moderate Risk 🟡 ({risk_score:.2f}/100)")
     else:
         st.error(f"High Risk 🔴 ({risk_score:.2f}/100)")
+    # VaR / Expected Shortfall
+    st.subheader("📉 Value at Risk")
+    with stage("risk report"):
+        var_df = risk_report(panel, weight_array, labels=["Your Portfolio"])
+    var_df["VaR (₹)"] = var_df["VaR"] * initial_investment
+    var_df["ES (₹)"] = var_df["ES"] * initial_investment
+    st.dataframe(
+        var_df.drop(columns="Portfolio").style.format({
+            "Confidence": "{:.0%}", "VaR": "{:.2%}", "ES": "{:.2%}", "VaR (₹)": "₹{:,.0f}", "ES (₹)": "₹{:,.0f}"}),
+        hide_index=True)
+    with st.expander("Component VaR (95%, 1 day)"):
+        st.dataframe(component_var(panel, weight_array, 0.95, 1).style.format({
+            "Weight": "{:.2%}", "Marginal VaR": "{:.4f}", "Component VaR": "{:.4f}", "Contribution %": "{:.1f}%"}))
     # best vs worst contributor
-    returns_df = prices_named.pct_change().fillna(0)
-    weighted_returns = returns_df * weights
+    weighted_returns = panel.simple_returns * weights
     contribution = weighted_returns.sum()
     contribution = contribution.sort_values(ascending=False)
     best_stock = contribution.idxmax()
@@ -383,69 +482,122 @@ with tabs[2]:
     # 5️⃣ Portfolio cumulative returns chart
     st.subheader("Portfolio Cumulative Returns")
     st.plotly_chart(
-        portfolio_chart(portfolio_returns),
+        portfolio_chart(values.iloc[:, 0].pct_change().dropna()),
         use_container_width=True
     )
     portfolio_summary = portfolio_returns.describe().to_string()
     show_ai_section("portfolio_chart", "Portfolio Performance", portfolio_summary)
     # portfolio optimizor
-    num_portfolios = 3000
-    results = []
-    returns = returns_df
-    for _ in range(num_portfolios):
-        w = np.random.random(len(prices_named.columns))
-        w = w / np.sum(w)
-        port_return = np.sum(returns.mean() * w)
-        port_vol = np.sqrt(np.dot(w.T, np.dot(returns.cov(), w)))
-        sharpe = port_return / port_vol if port_vol != 0 else 0
-        results.append((sharpe, w))
-    best = max(results, key=lambda x: x[0])
-    best_weights = best[1]
+    num_portfolios = st.number_input(
+        "Optimizer samples",
+        min_value=1000,
+        max_value=1_000_000,
+        value=DEFAULT_SAMPLES,
+        step=10_000)
+    with stage("optimizer"):
+        _, sample_returns, sample_vols, _ = random_portfolios(panel, int(num_portfolios), seed=42)
+        mv = mean_variance(panel)  # one covariance / Cholesky factor for every solve below
+        max_sharpe_stats, best_weights = optimize_portfolio(mv, "max_sharpe")
+        min_var_stats, min_var_weights = optimize_portfolio(mv, "min_variance")
+        frontier_df, _ = efficient_frontier(mv, points=50)
+    if mv.failures:
+        st.warning(f"Optimizer did not converge ({mv.failures[0]}); affected portfolios use equal weights "
+                   "and failed frontier points are skipped.")
+    st.subheader("Efficient Frontier")
+    shown = slice(None, None, max(1, len(sample_vols) // 5000))  # keep the cloud light
+    st.plotly_chart(
+        efficient_frontier_chart(
+            frontier_df,
+            sample_vols[shown],
+            sample_returns[shown],
+            {"Max Sharpe": max_sharpe_stats, "Min Variance": min_var_stats}),
+        use_container_width=True)
+    st.subheader("Portfolio Comparison")
+    comparison = evaluate_portfolios(
+        panel,
+        np.vstack([weight_array, best_weights, min_var_weights, np.full(len(weight_array), 1 / len(weight_array))]),
+        labels=["Your Portfolio", "Max Sharpe", "Min Variance", "Equal Weight"])
+    st.dataframe(comparison.style.format({
+        "Avg Daily Return": "{:.4f}", "Volatility": "{:.4f}", "Sharpe Ratio": "{:.4f}",
+        "Max Drawdown": "{:.2%}", "Final Value (daily rebalanced)": "{:.2f}x"}))
     st.subheader("Suggested Optimal Portfolio (Sharpe Maximized)")
     col1, col2 = st.columns([1, 2],gap="large") 
     opt_df = pd.DataFrame({
         "Stock": prices_named.columns,
-        "Weight": best_weights
+        "Weight": best_weights.values
     })
     with col1:
         st.dataframe(opt_df, width=1000, height=250)
     with col2:
         st.markdown("### 📊 Allocation Chart")
         st.bar_chart(opt_df.set_index("Stock"))
+# ------------------ ROLLING ------------------
+with tabs[3], stage("tab: rolling"):
+    st.subheader("Rolling Analytics")
+    r1, r2 = st.columns(2)
+    window = r1.slider("Window (trading days)", min_value=10, max_value=252, value=63, step=1)
+    benchmark_name = r2.selectbox(
+        "Benchmark",
+        list(BENCHMARKS.keys()) + list(prices_named.columns))
+    if benchmark_name in BENCHMARKS:
+        bench_df = load_prices((BENCHMARKS[benchmark_name],), start_date, end_date, PRICE_DTYPE)
+        if bench_df.empty:
+            st.warning(f"No data for {benchmark_name}, using {prices_named.columns[0]} instead.")
+            benchmark_name = prices_named.columns[0]
+            bench_prices = prices_named[benchmark_name]
+        else:
+            bench_prices = bench_df.iloc[:, 0]
+    else:
+        bench_prices = prices_named[benchmark_name]
+    bench_prices = bench_prices.reindex(prices_named.index).ffill().bfill()
+    bench_returns = np.log(bench_prices / bench_prices.shift(1))
+    if len(panel.log_returns) < window:
+        st.warning("Not enough data for the selected window.")
+    else:
+        st.plotly_chart(
+            rolling_metric_chart(rolling_volatility(panel, window), "Rolling Volatility", "Volatility"),
+            use_container_width=True)
+        st.plotly_chart(
+            rolling_metric_chart(rolling_sharpe(panel, window), "Rolling Sharpe Ratio", "Sharpe Ratio"),
+            use_container_width=True)
+        st.plotly_chart(
+            rolling_metric_chart(rolling_beta(panel, bench_returns, window), f"Rolling Beta vs {benchmark_name}", "Beta"),
+            use_container_width=True)
+        pair_panel = ReturnsPanel(prices_named.assign(**{f"Benchmark: {benchmark_name}": bench_prices}))
+        pairs = [(c, f"Benchmark: {benchmark_name}") for c in prices_named.columns if c != benchmark_name]
+        if pairs:
+            st.plotly_chart(
+                rolling_metric_chart(rolling_correlation(pair_panel, window, pairs), f"Rolling Correlation with {benchmark_name}", "Correlation"),
+                use_container_width=True)
+with stage("wait for AI insights"):
+    fill_pending_insights()
 # spacing for next section
 st.markdown("---")
 # ============================================================
 # BUILD GLOBAL DASHBOARD CONTEXT (for Smart Advisor)
 # ============================================================
-stats_text = stats_df.to_string()
-corr_text = prices_named.corr().to_string()
-portfolio_text = str(portfolio_stats)
-price_summary = prices_named.describe().to_string()
-def get_relevant_context(question, context):
-    q = question.lower()
-    if "sharpe" in q or "risk" in q or "portfolio" in q:
-        return context.split("CORRELATIONS:")[0] + "\n" + context.split("PORTFOLIO METRICS:")[1]
-    if "correlation" in q:
-        return context.split("CORRELATIONS:")[1].split("PORTFOLIO METRICS:")[0]
-    if "price" in q or "return" in q:
-        return context.split("PRICE SUMMARY:")[1]
-    if "stock" in q:
-        return context.split("STOCK STATISTICS:")[1].split("CORRELATIONS:")[0]
-    return context
-dashboard_context = f"""
-STOCK STATISTICS:
-{stats_text}
-CORRELATIONS:
-{corr_text}
-PORTFOLIO METRICS:
-{portfolio_text}
-PRICE SUMMARY:
-{price_summary}
-"""
+# compact sections rebuilt only when the data or weights change
+context_key = (tuple(panel.columns), start_date, end_date, tuple(np.round(weight_array, 4)), initial_investment, policy, cost_bps)
+if st.session_state.get("advisor_context_key") != context_key:
+    var_95 = var_df[(var_df["Method"] == "historical") & (var_df["Confidence"] == 0.95) & (var_df["Horizon"] == 1)].iloc[0]
+    st.session_state.advisor_context = AdvisorContext(
+        stats_df,
+        panel.corr,
+        {
+            "avg daily return": f'{portfolio_stats["Avg Daily Return"]:.5f}',
+            "volatility": f'{portfolio_stats["Volatility"]:.5f}',
+            "sharpe ratio": f'{portfolio_stats["Sharpe Ratio"]:.4f}',
+            "risk score": f"{risk_score:.1f}/100",
+            "1-day 95% VaR / ES": f'{var_95["VaR"]:.2%} / {var_95["ES"]:.2%}',
+            f"value of ₹{initial_investment:,.0f} ({policy.lower()})": f"₹{final_value:,.0f} ({return_pct:.1f}%)"
+        },
+        weights,
+        (prices_named.index[0].date(), prices_named.index[-1].date(), len(prices_named)))
+    st.session_state.advisor_context_key = context_key
 # ============================================================
 # FLOATING SMART ADVISOR UI
 # ============================================================
-from ai_utils import ask_dashboard_question
+from ai_utils import stream_dashboard_question
 # Memory
 if "advisor_open" not in st.session_state:
     st.session_state.advisor_open = False
@@ -483,13 +635,29 @@ if st.session_state.advisor_open:
         user_q = st.text_input("Ask about portfolio, risk, market outlook")
         send = st.form_submit_button("Send")
     if send and user_q:
-        history_text = "\n".join([f"{r}: {m}" for r, m in st.session_state.advisor_history])
-        answer = ask_dashboard_question(
-            user_q,
-            dashboard_context,
-            history_text)
-        st.session_state.advisor_history.append(("You", user_q))
-        st.session_state.advisor_history.append(("AI", answer))
-        st.session_state.advisor_input = ""  # 🔥 clears input
-        st.rerun()
-    st.markdown('</div>', unsafe_allow_html=True)
\ No newline at end of file
+        # recent turns only, so the prompt stays within budget in long chats
+        history_text = "\n".join([f"{r}: {m}" for r, m in st.session_state.advisor_history[-ADVISOR_HISTORY_TURNS:]])
+        st.write("YOU : ", user_q)
+        with stage("advisor answer"):
+            # rendered token by token; write_stream returns the full text
+            try:
+                answer = st.write_stream(stream_dashboard_question(
+                    user_q,
+                    st.session_state.advisor_context.for_question(user_q),
+                    history_text,
+                    cancel_streams))
+            except StreamError as e:
+                answer = None
+                st.error(str(e))
+        if answer is not None:
+            st.session_state.advisor_history.append(("You", user_q))
+            st.session_state.advisor_history.append(("AI", answer))
+            st.session_state.advisor_input = ""  # 🔥 clears input
+            st.rerun()
+    st.markdown('</div>', unsafe_allow_html=True)
+# ============================================================
+# DEVELOPER TIMINGS
+# ============================================================
+if show_timings:
+    st.sidebar.markdown(f"**This rerun:** {timer.total_ms():,.0f} ms")
+    st.sidebar.plotly_chart(timing_waterfall_chart(timer.records), use_container_width=True)
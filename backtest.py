@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+from returns_panel import as_panel
+from timing import timed
+
+# pandas period codes accepted for calendar rebalancing
+CALENDARS = {"weekly": "W", "monthly": "M", "quarterly": "Q", "yearly": "Y"}
+
+
+def _growth(prices):
+    """Growth of 1 held in each column since the first row (flat before listing)"""
+    first = prices.bfill().iloc[0]
+    return (prices.ffill() / first).fillna(1.0).to_numpy(dtype=float)
+
+
+def _candidates(index, rebalance):
+    """Boolean mask of the days on which a rebalance may happen"""
+    days = np.zeros(len(index), dtype=bool)
+    if rebalance is None:
+        return days
+    if rebalance == "daily":
+        days[1:] = True
+        return days
+    periods = pd.DatetimeIndex(index).to_period(CALENDARS.get(rebalance, rebalance))
+    # first trading day of each new period
+    days[1:] = periods[1:] != periods[:-1]
+    return days
+
+
+@timed
+def backtest(panel, weights, rebalance=None, threshold=None, cost_bps=0.0,
+             initial=1.0, labels=None, block=63):
+    """
+    Simulate K portfolios over the panel's prices.
+
+    weights: target weights, N or K×N. rebalance: None (buy and hold),
+    "daily", "weekly", "monthly", "quarterly", "yearly" or a pandas period
+    code. threshold: only rebalance when some weight has drifted more than
+    this from target (checked on every rebalance day, or daily when
+    rebalance is None). Trading costs cost_bps per unit of value traded.
+
+    Holdings between rebalances are just start holdings × price growth, so
+    the loop runs once per block of days / rebalance event, never per day.
+    Returns (values T×K frame, summary frame indexed by portfolio).
+    """
+    prices = as_panel(panel).prices
+    growth = _growth(prices)
+    W = np.atleast_2d(np.asarray(weights, dtype=float))
+    T, K = len(prices), len(W)
+    rate = cost_bps / 10_000
+    if labels is None:
+        labels = [f"Portfolio {k + 1}" for k in range(K)]
+
+    if rebalance == "daily" and threshold is None:
+        return _daily(growth, W, rate, initial, prices.index, labels)
+
+    candidates = _candidates(prices.index, rebalance)
+    if threshold is not None and rebalance is None:
+        candidates[1:] = True
+    # first candidate day at or after each day; without a threshold every
+    # candidate is an event, so a block never needs to run past it
+    next_candidate = np.minimum.accumulate(np.where(candidates, np.arange(T), T)[::-1])[::-1]
+
+    values = np.empty((T, K))
+    values[0] = initial
+    units = initial * W / growth[0]  # holdings in "growth units" per asset
+    done = np.zeros(K, dtype=int)    # last day whose value is known
+    rebalances = np.zeros(K, dtype=int)
+    turnover = np.zeros(K)
+    costs = np.zeros(K)
+
+    while (done < T - 1).any():
+        lo = done.min() + 1
+        hi = min(lo + block, T)
+        if threshold is None:
+            hi = min(hi, next_candidate[lo] + 1)
+        active = done < hi - 1
+        days = np.arange(lo, hi)
+
+        holdings = units[active][:, None, :] * growth[None, lo:hi]  # k × day × asset
+        value = holdings.sum(axis=2)
+        event = candidates[None, lo:hi] & (days[None, :] > done[active][:, None])
+        if threshold is not None:
+            drift = np.abs(holdings / value[:, :, None] - W[active][:, None, :]).max(axis=2)
+            event &= drift > threshold
+
+        has_event = event.any(axis=1)
+        stop = np.where(has_event, lo + event.argmax(axis=1), hi - 1)
+
+        idx = np.flatnonzero(active)
+        fill = (days[None, :] > done[active][:, None]) & (days[None, :] <= stop[:, None])
+        rows, cols = np.nonzero(fill)
+        values[days[cols], idx[rows]] = value[rows, cols]
+
+        # rebalance every portfolio whose event fell in this block
+        j = np.flatnonzero(has_event)
+        k, t = idx[j], stop[j]
+        held = holdings[j, t - lo]
+        before = value[j, t - lo]
+        traded = np.abs(before[:, None] * W[k] - held).sum(axis=1)
+        after = before - rate * traded
+        units[k] = after[:, None] * W[k] / growth[t]
+        values[t, k] = after
+        rebalances[k] += 1
+        turnover[k] += traded / before
+        costs[k] += rate * traded
+        done[active] = stop
+
+    return _result(values, rebalances, turnover, costs, initial, prices.index, labels)
+
+
+def _daily(growth, W, rate, initial, index, labels):
+    """Daily rebalancing in closed form: each day's drift and trade only depend on that day's returns"""
+    relative = growth[1:] / growth[:-1]                       # day × asset
+    gross = relative @ W.T                                     # day × k
+    drifted = W[None, :, :] * relative[:, None, :] / gross[:, :, None]
+    traded = np.abs(drifted - W[None, :, :]).sum(axis=2)       # fraction of value traded
+    growth_k = gross * (1 - rate * traded)
+    values = initial * np.vstack([np.ones((1, len(W))), np.cumprod(growth_k, axis=0)])
+    before = values[:-1] * gross
+    T = len(growth)
+    return _result(values, np.full(len(W), T - 1), traded.sum(axis=0),
+                   (rate * traded * before).sum(axis=0), initial, index, labels)
+
+
+def _result(values, rebalances, turnover, costs, initial, index, labels):
+    values = pd.DataFrame(values, index=index, columns=labels)
+    summary = pd.DataFrame({
+        "Final Value": values.iloc[-1].to_numpy(),
+        "Total Return": values.iloc[-1].to_numpy() / initial - 1,
+        "Rebalances": rebalances,
+        "Turnover": turnover,
+        "Costs": costs
+    }, index=labels)
+    return values, summary
@@ -0,0 +1,158 @@
+"""
+Headless batch analytics over a file of portfolio definitions.
+
+    python batch.py portfolios.json --out results --format parquet --workers 8
+
+Definitions are a JSON list (or CSV with the same columns):
+    {"name": "client-1", "tickers": ["AAPL", "MSFT"], "weights": [0.6, 0.4],
+     "start": "2022-01-01", "end": "2024-01-01"}
+In CSV, tickers and weights are ";"-separated. Missing weights mean equal weights.
+An invalid definition is reported in its row's Error column; the rest still run.
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data import (
+    fetch_prices, clean_prices, stock_statistics, compute_portfolio,
+    optimize_portfolio, portfolio_risk_score
+)
+from returns_panel import ReturnsPanel
+
+
+def _split(value):
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(";") if v.strip()]
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return []
+    return list(value)
+
+
+def _blank(value):
+    return value is None or (isinstance(value, float) and np.isnan(value)) or str(value).strip() == ""
+
+
+def _definition(i, record):
+    """One validated definition; problems are kept in "error" instead of raised"""
+    definition = {"name": str(record.get("name", i)), "error": None}
+    try:
+        tickers = _split(record.get("tickers"))
+        weights = [float(w) for w in _split(record.get("weights"))]
+        missing = [field for field in ("start", "end") if _blank(record.get(field))]
+        if not tickers:
+            raise ValueError("no tickers")
+        if weights and len(weights) != len(tickers):
+            raise ValueError(f"{len(tickers)} tickers but {len(weights)} weights")
+        if missing:
+            raise ValueError(f"missing {' and '.join(missing)}")
+    except (TypeError, ValueError) as e:
+        definition["error"] = f"Definition {i}: {e}"
+        return definition
+    definition.update({
+        "tickers": tickers,
+        "weights": weights or [1 / len(tickers)] * len(tickers),
+        "start": record["start"],
+        "end": record["end"]
+    })
+    return definition
+
+
+def load_definitions(path):
+    if path.endswith(".csv"):
+        records = pd.read_csv(path).to_dict("records")
+    else:
+        with open(path, "r") as f:
+            records = json.load(f)
+    return [_definition(i, record) for i, record in enumerate(records)]
+
+
+def prefetch(definitions):
+    """Warm the price cache once per date range so workers only read from disk"""
+    ranges = {}
+    for d in definitions:
+        if d["error"]:
+            continue
+        ranges.setdefault((d["start"], d["end"]), set()).update(d["tickers"])
+    for (start, end), tickers in ranges.items():
+        fetch_prices(sorted(tickers), start, end)
+
+
+def analyze(definition):
+    """Statistics, risk score and optimizer output for one portfolio definition"""
+    name = definition["name"]
+    if definition["error"]:
+        return {"Portfolio": name, "Error": definition["error"]}, None, None
+    try:
+        prices = clean_prices(fetch_prices(definition["tickers"], definition["start"], definition["end"]))
+        weights = pd.Series(definition["weights"], index=definition["tickers"]).groupby(level=0).sum()
+        weights = weights.reindex(prices.columns).fillna(0)
+        if prices.empty or weights.sum() == 0:
+            raise ValueError("no price data for any weighted ticker")
+        weights = weights / weights.sum()
+
+        panel = ReturnsPanel(prices)
+        portfolio_stats, _ = compute_portfolio(panel, weights.to_numpy())
+        optimal_stats, optimal_weights = optimize_portfolio(panel, "max_sharpe")
+
+        summary = {
+            "Portfolio": name,
+            **portfolio_stats,
+            "Risk Score": portfolio_risk_score(portfolio_stats),
+            "Optimal Sharpe Ratio": optimal_stats["Sharpe Ratio"],
+            "Error": None
+        }
+        stocks = stock_statistics(panel)
+        stocks.insert(0, "Portfolio", name)
+        allocation = pd.DataFrame({
+            "Portfolio": name,
+            "Company": weights.index,
+            "Weight": weights.to_numpy(),
+            "Optimal Weight": optimal_weights.reindex(weights.index).to_numpy()
+        })
+        return summary, stocks, allocation
+    except Exception as e:
+        return {"Portfolio": name, "Error": str(e)}, None, None
+
+
+def write_results(summaries, stocks, allocations, out_dir, fmt):
+    os.makedirs(out_dir, exist_ok=True)
+    frames = {
+        "summary": pd.DataFrame(summaries),
+        "stock_statistics": pd.concat([s for s in stocks if s is not None] or [pd.DataFrame()], ignore_index=True),
+        "allocations": pd.concat([a for a in allocations if a is not None] or [pd.DataFrame()], ignore_index=True)
+    }
+    for name, df in frames.items():
+        path = os.path.join(out_dir, f"{name}.{fmt}")
+        if fmt == "parquet":
+            df.to_parquet(path, index=False)
+        else:
+            df.to_csv(path, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch portfolio analytics")
+    parser.add_argument("definitions", help="JSON or CSV file of portfolio definitions")
+    parser.add_argument("--out", default="batch_results", help="output directory")
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    definitions = load_definitions(args.definitions)
+    prefetch(definitions)
+
+    chunksize = max(1, len(definitions) // (args.workers * 4))
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(analyze, definitions, chunksize=chunksize))
+
+    summaries, stocks, allocations = zip(*results) if results else ([], [], [])
+    write_results(summaries, stocks, allocations, args.out, args.format)
+    failed = sum(1 for s in summaries if s["Error"])
+    print(f"Analyzed {len(summaries)} portfolios ({failed} failed) -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
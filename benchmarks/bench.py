@@ -0,0 +1,143 @@
+"""
+Offline benchmarks for the analytics hot paths on synthetic price panels.
+
+    python -m benchmarks.bench --sizes 252x10,2520x50,2520x500 --output bench_results.json
+    python -m benchmarks.bench --baseline bench_results.json --tolerance 1.25
+
+Every case gets a fresh ReturnsPanel per run so memoization never hides
+the cost being measured. Time is the median of --repeat runs; peak memory
+comes from one extra run under tracemalloc. With --baseline, cases slower
+than tolerance × baseline are reported and the exit code is 1.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from backtest import backtest
+from charts import compare_price_chart, correlation_heatmap, portfolio_chart
+from data import compute_statistics, compute_portfolio, evaluate_portfolios, stock_statistics, optimize_portfolio, efficient_frontier
+from optimizer import random_portfolios
+from returns_panel import ReturnsPanel
+from risk import risk_report
+from rolling import rolling_volatility
+from simulation import simulate_growth
+
+
+def synthetic_prices(days, tickers, seed=0):
+    """Geometric random walks with a few common factors, business-day indexed"""
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(0, 0.008, (days, 3))
+    loadings = rng.normal(0.5, 0.3, (3, tickers))
+    returns = factors @ loadings + rng.normal(0.0003, 0.012, (days, tickers))
+    index = pd.bdate_range("2000-01-03", periods=days, name="Date")
+    columns = [f"Company {i}" for i in range(tickers)]
+    return pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), index=index, columns=columns)
+
+
+def _equal_weights(panel):
+    return np.full(len(panel.columns), 1 / len(panel.columns))
+
+
+CASES = {
+    "compute_statistics": lambda p: compute_statistics(p),
+    "compute_portfolio": lambda p: compute_portfolio(p, _equal_weights(p)),
+    "evaluate_portfolios": lambda p: evaluate_portfolios(p, np.random.default_rng(0).dirichlet(np.ones(len(p.columns)), 10_000)),
+    "stock_statistics": lambda p: stock_statistics(p),
+    "optimizer_monte_carlo": lambda p: random_portfolios(p, 100_000, seed=0),
+    "optimizer_max_sharpe": lambda p: optimize_portfolio(p, "max_sharpe"),
+    "efficient_frontier": lambda p: efficient_frontier(p, points=50),
+    "correlation_heatmap": lambda p: correlation_heatmap(p),
+    "compare_price_chart": lambda p: compare_price_chart(p.normalized, list(p.columns)),
+    "portfolio_chart": lambda p: portfolio_chart(compute_portfolio(p, _equal_weights(p))[1]),
+    "rolling_volatility": lambda p: rolling_volatility(p, 63),
+    "simulate_growth": lambda p: simulate_growth(p, _equal_weights(p), 252, 100_000, seed=0),
+    "risk_report_batch": lambda p: risk_report(p, np.random.default_rng(0).dirichlet(np.ones(len(p.columns)), 1_000)),
+    "backtest_monthly": lambda p: backtest(p, np.tile(_equal_weights(p), (20, 1)), "monthly", cost_bps=10),
+}
+
+
+def measure(case, prices, repeat):
+    fn = CASES[case]
+    timings = []
+    for _ in range(repeat):
+        panel = ReturnsPanel(prices)
+        start = time.perf_counter()
+        fn(panel)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn(ReturnsPanel(prices))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "case": case,
+        "days": prices.shape[0],
+        "tickers": prices.shape[1],
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "peak_mb": peak / 2 ** 20
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Rows of (case, size, ratio) for cases slower than tolerance × baseline"""
+    base = {(r["case"], r["days"], r["tickers"]): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        old = base.get((r["case"], r["days"], r["tickers"]))
+        if old is None:
+            continue
+        ratio = r["median_s"] / old["median_s"] if old["median_s"] else float("inf")
+        if ratio > tolerance:
+            regressions.append((r["case"], f'{r["days"]}x{r["tickers"]}', ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the analytics hot paths")
+    parser.add_argument("--sizes", default="252x10,2520x50,2520x500", help="comma-separated DAYSxTICKERS")
+    parser.add_argument("--cases", default=",".join(CASES), help="comma-separated case names")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="allowed slowdown ratio")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes.split(","):
+        days, tickers = (int(v) for v in size.lower().split("x"))
+        prices = synthetic_prices(days, tickers, args.seed)
+        for case in args.cases.split(","):
+            r = measure(case, prices, args.repeat)
+            results.append(r)
+            print(f'{case:<24} {size:>10}  {r["median_s"] * 1000:10.2f} ms  {r["peak_mb"]:8.1f} MB')
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.platform(),
+            "results": results
+        }, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for case, size, ratio in regressions:
+            print(f"REGRESSION {case} {size}: {ratio:.2f}x slower than baseline")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,45 @@
 import plotly.express as px
 import pandas as pd
-import numpy as np
-def compare_price_chart(price_df, selected):
-    df = price_df[selected].copy()
-    df = df.dropna()
-    df = df.reset_index()
+from config import CHART_WIDTH_PX, POINTS_PER_PIXEL, WEBGL_THRESHOLD, HEATMAP_TEXT_THRESHOLD, HEATMAP_MAX_SIZE
+from correlation import cluster_order, reorder, block_average
+from downsample import reduce_frame
+from returns_panel import as_panel
+from timing import timed
+
+def _reduce(df, max_points, value_name, var_name):
+    """Downsample to the pixel budget and pick SVG or WebGL for the result"""
+    long_df = reduce_frame(df, max_points or CHART_WIDTH_PX * POINTS_PER_PIXEL, value_name, var_name)
+    return long_df, "webgl" if len(long_df) > WEBGL_THRESHOLD else "svg"
+
+@timed
+def compare_price_chart(price_df, selected, max_points=None, render_mode=None):
+    df = price_df[selected].dropna()
+    df, auto_mode = _reduce(df, max_points, "Price", "Company")
     fig = px.line(
         df,
         x="Date",
-        y=selected,   # multiple columns
+        y="Price",
+        color="Company",   # one line per company
+        render_mode=render_mode or auto_mode,
         title="Stock Price Comparison (Normalized Base = 100)"
     )
     return fig
 
-def correlation_heatmap(price_df):
-    returns = price_df.pct_change().dropna()
-    corr=returns.corr()
+@timed
+def correlation_heatmap(panel, cluster=True, max_size=None, text_threshold=None):
+    corr = as_panel(panel).corr
+    if cluster:
+        # similar companies end up next to each other
+        corr = reorder(corr, cluster_order(corr))
+    max_size = max_size or HEATMAP_MAX_SIZE
+    if len(corr) > max_size:
+        corr = block_average(corr, max_size)
     fig = px.imshow(
             corr,
             color_continuous_scale="RdYlGn",
-            text_auto=True,
+            zmin=-1,
+            zmax=1,
+            text_auto=".2f" if len(corr) <= (text_threshold or HEATMAP_TEXT_THRESHOLD) else False,
             title="Stock Return Correlation",
         )
         # Update axis labels to show "Company" instead of "Ticker"
@@ -27,14 +47,34 @@ def correlation_heatmap(price_df):
     fig.update_yaxes(title_text="Company")        
     return fig
 
-def portfolio_chart(portfolio_returns):
+@timed
+def top_pairs_chart(pairs_df):
+    """Horizontal bar chart of the most correlated company pairs"""
+    df = pairs_df.assign(Pair=pairs_df["Company A"] + " / " + pairs_df["Company B"])
+    fig = px.bar(
+        df,
+        x="Correlation",
+        y="Pair",
+        orientation="h",
+        color="Correlation",
+        color_continuous_scale="RdYlGn",
+        range_color=[-1, 1],
+        title="Most Correlated Pairs"
+    )
+    fig.update_yaxes(autorange="reversed")
+    return fig
+
+@timed
+def portfolio_chart(portfolio_returns, max_points=None, render_mode=None):
     cum = (1 + portfolio_returns).cumprod()
-    df = pd.DataFrame({"Cumulative Return": cum})
+    df = pd.DataFrame({"Portfolio": cum})
+    df, auto_mode = _reduce(df, max_points, "Cumulative Return", "Series")
     return px.line(
-        df,y="Cumulative Return",title="Portfolio Cumulative Returns"
+        df,x=df.columns[0],y="Cumulative Return",render_mode=render_mode or auto_mode,title="Portfolio Cumulative Returns"
     )
 # ------------------ New Charts ------------------
 
+@timed
 def statistics_bar_chart(stats_df, column):
     """Bar chart comparing companies for a selected metric"""
     import plotly.express as px
@@ -54,12 +94,14 @@ def statistics_bar_chart(stats_df, column):
     fig.update_layout(yaxis_title=column, xaxis_title="Company")
     return fig
 
-def daily_returns_histogram(price_df, selected_company):
+@timed
+def daily_returns_histogram(panel, selected_company):
     """Histogram of daily returns for a single company"""
-    if selected_company not in price_df.columns:
+    panel = as_panel(panel)
+    if selected_company not in panel.columns:
         return None
 
-    returns = np.log(price_df[selected_company] / price_df[selected_company].shift(1)).dropna()
+    returns = panel.log_returns[selected_company]
     fig = px.histogram(
         returns,
         nbins=50,
@@ -68,3 +110,100 @@ def daily_returns_histogram(price_df, selected_company):
         #marginal="box"
     )
     return fig
+
+@timed
+def efficient_frontier_chart(frontier_df, sample_vols=None, sample_returns=None, highlights=None):
+    """Efficient frontier line over an optional cloud of random portfolios"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    if sample_vols is not None:
+        fig.add_trace(go.Scattergl(
+            x=sample_vols,
+            y=sample_returns,
+            mode="markers",
+            name="Random Portfolios",
+            marker=dict(size=3, color="lightgray")
+        ))
+    fig.add_trace(go.Scatter(
+        x=frontier_df["Volatility"],
+        y=frontier_df["Avg Daily Return"],
+        mode="lines",
+        name="Efficient Frontier",
+        line=dict(width=3)
+    ))
+    for label, stats in (highlights or {}).items():
+        fig.add_trace(go.Scatter(
+            x=[stats["Volatility"]],
+            y=[stats["Avg Daily Return"]],
+            mode="markers",
+            name=label,
+            marker=dict(size=12, symbol="star")
+        ))
+    fig.update_layout(
+        title="Efficient Frontier",
+        xaxis_title="Volatility",
+        yaxis_title="Avg Daily Return"
+    )
+    return fig
+
+@timed
+def rolling_metric_chart(metric_df, title, yaxis_title, max_points=None, render_mode=None):
+    """Line chart of a rolling metric, one line per company / pair"""
+    df, auto_mode = _reduce(metric_df.dropna(how="all"), max_points, yaxis_title, "Company")
+    fig = px.line(
+        df,
+        x=df.columns[0],
+        y=yaxis_title,
+        color="Company",
+        render_mode=render_mode or auto_mode,
+        title=title
+    )
+    return fig
+
+@timed
+def simulation_fan_chart(bands, title="Simulated Portfolio Value"):
+    """Percentile bands of simulated value: outer pairs shaded, median as a line"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    columns = list(bands.columns)
+    for i in range(len(columns) // 2):
+        low, high = columns[i], columns[-1 - i]
+        fig.add_trace(go.Scatter(
+            x=bands.index, y=bands[high], mode="lines", line=dict(width=0),
+            showlegend=False, hoverinfo="skip"
+        ))
+        fig.add_trace(go.Scatter(
+            x=bands.index, y=bands[low], mode="lines", line=dict(width=0),
+            fill="tonexty", fillcolor=f"rgba(31, 119, 180, {0.15 + 0.15 * i})",
+            name=f"{low}-{high}"
+        ))
+    if len(columns) % 2:
+        middle = columns[len(columns) // 2]
+        fig.add_trace(go.Scatter(x=bands.index, y=bands[middle], mode="lines", name=middle, line=dict(width=2)))
+    fig.update_layout(title=title, xaxis_title="Trading days ahead", yaxis_title="Value")
+    return fig
+
+def timing_waterfall_chart(records):
+    """Waterfall of one rerun's stages: bars start at their offset into the rerun"""
+    import plotly.graph_objects as go
+
+    records = sorted(records, key=lambda r: r["start_ms"])
+    labels = [f'{"  " * r["depth"]}{r["stage"]} #{i}' for i, r in enumerate(records)]
+    fig = go.Figure(go.Bar(
+        y=labels,
+        x=[r["duration_ms"] for r in records],
+        base=[r["start_ms"] for r in records],
+        orientation="h",
+        hovertext=[f'{r["stage"]}: {r["duration_ms"]:.1f} ms ({r["thread"]})' for r in records],
+        hoverinfo="text"
+    ))
+    fig.update_yaxes(autorange="reversed", showticklabels=len(records) <= 40)
+    fig.update_layout(
+        title="Rerun Timings",
+        xaxis_title="ms since rerun start",
+        height=max(300, 18 * len(records)),
+        margin=dict(l=10, r=10, t=40, b=10)
+    )
+    return fig
@@ -0,0 +1,108 @@
+import bisect
+import difflib
+import threading
+
+from cachetools import TTLCache
+from yfinance import Search
+
+
+def _normalize(text):
+    return " ".join(text.lower().replace("’", "'").split())
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CompanyIndex:
+    """
+    Prebuilt search over company names and tickers: exact match, then
+    prefix match on any word of the name or the ticker, then fuzzy
+    (trigram candidates ranked by similarity).
+    """
+
+    def __init__(self, companies):
+        # companies: {name: ticker}
+        self.entries = sorted(companies.items())
+        self.by_name = {_normalize(name): i for i, (name, _) in enumerate(self.entries)}
+        self.by_ticker = {}
+        keys = []
+        self.trigrams = {}
+        for i, (name, ticker) in enumerate(self.entries):
+            norm_name, norm_ticker = _normalize(name), _normalize(ticker)
+            self.by_ticker.setdefault(norm_ticker, i)
+            words = norm_name.split()
+            # every word start, so "bank" finds "HDFC Bank"
+            for w in range(len(words)):
+                keys.append((" ".join(words[w:]), i))
+            keys.append((norm_ticker, i))
+            for gram in _trigrams(norm_name) | _trigrams(norm_ticker):
+                self.trigrams.setdefault(gram, set()).add(i)
+        keys.sort()
+        self.keys = [k for k, _ in keys]
+        self.key_ids = [i for _, i in keys]
+
+    def lookup(self, query):
+        """Exact (case-insensitive) name or ticker match as (name, ticker)"""
+        q = _normalize(query)
+        i = self.by_name.get(q, self.by_ticker.get(q))
+        return None if i is None else self.entries[i]
+
+    def _prefix(self, q):
+        start = bisect.bisect_left(self.keys, q)
+        ids = []
+        for k in range(start, len(self.keys)):
+            if not self.keys[k].startswith(q):
+                break
+            ids.append(self.key_ids[k])
+        return ids
+
+    def _fuzzy(self, q, limit, cutoff):
+        counts = {}
+        for gram in _trigrams(q):
+            for i in self.trigrams.get(gram, ()):
+                counts[i] = counts.get(i, 0) + 1
+        # only score the entries sharing the most trigrams with the query
+        candidates = sorted(counts, key=counts.get, reverse=True)[:limit * 10]
+        scored = []
+        for i in candidates:
+            name, ticker = self.entries[i]
+            score = max(
+                difflib.SequenceMatcher(None, q, _normalize(name)).ratio(),
+                difflib.SequenceMatcher(None, q, _normalize(ticker)).ratio()
+            )
+            if score >= cutoff:
+                scored.append((score, i))
+        scored.sort(reverse=True)
+        return [i for _, i in scored]
+
+    def search(self, query, limit=8, cutoff=0.6):
+        q = _normalize(query)
+        if not q:
+            return []
+        ids = []
+        exact = self.by_name.get(q, self.by_ticker.get(q))
+        if exact is not None:
+            ids.append(exact)
+        ids.extend(self._prefix(q))
+        if len(ids) < limit:
+            ids.extend(self._fuzzy(q, limit, cutoff))
+        return [self.entries[i] for i in dict.fromkeys(ids)][:limit]
+
+
+_remote_cache = TTLCache(maxsize=1024, ttl=6 * 3600)
+_remote_lock = threading.Lock()
+
+
+def remote_search(query, max_results=5):
+    """Yahoo Finance search as [(name, ticker)], cached per normalized query"""
+    key = (_normalize(query), max_results)
+    with _remote_lock:
+        if key in _remote_cache:
+            return _remote_cache[key]
+    quotes = Search(query, max_results=max_results).quotes
+    results = [(q.get("shortname") or q.get("longname") or query, q["symbol"]) for q in quotes if "symbol" in q]
+    with _remote_lock:
+        _remote_cache[key] = results
+    return results
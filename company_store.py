@@ -0,0 +1,106 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+STORE_FILE = os.environ.get("COMPANY_STORE_FILE", "companies.sqlite")
+LEGACY_FILE = "custom_companies.json"
+
+
+class CompanyStore:
+    """
+    User-added companies in SQLite (WAL). Adds are single-row upserts and
+    every add gets a new, increasing id, so a session can pick up other
+    sessions' additions with changes_since(last_id) instead of rereading
+    everything. The old custom_companies.json is imported on first open.
+    """
+
+    def __init__(self, path=STORE_FILE, legacy_file=LEGACY_FILE):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._lock, self._conn:
+            # BEGIN IMMEDIATE so only one process creates and migrates
+            self._conn.execute("BEGIN IMMEDIATE")
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] == 0:
+                self._create()
+                self._migrate(legacy_file)
+                self._conn.execute("PRAGMA user_version = 1")
+
+    def _create(self):
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS companies (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE,
+                ticker TEXT NOT NULL,
+                market TEXT,
+                sector TEXT,
+                added_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS companies_market_sector ON companies (market, sector)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS companies_ticker ON companies (ticker)")
+
+    def _migrate(self, legacy_file):
+        if not legacy_file or not os.path.exists(legacy_file):
+            return
+        with open(legacy_file, "r") as f:
+            companies = json.load(f)
+        now = time.time()
+        rows = []
+        for name, info in companies.items():
+            if isinstance(info, dict):
+                rows.append((name, info["ticker"], info.get("market"), info.get("sector"), now))
+            else:
+                rows.append((name, info, None, None, now))
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO companies (name, ticker, market, sector, added_at) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+
+    def add_company(self, name, ticker, market=None, sector=None):
+        # REPLACE deletes the old row, so an updated company gets a new id too
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO companies (name, ticker, market, sector, added_at) VALUES (?, ?, ?, ?, ?)",
+                (name, ticker, market, sector, time.time())
+            )
+
+    def list_companies(self, market=None, sector=None):
+        """[(name, ticker, market, sector)], optionally for one market and/or sector"""
+        query = "SELECT name, ticker, market, sector FROM companies"
+        clauses, params = [], []
+        if market is not None:
+            clauses.append("market = ?")
+            params.append(market)
+        if sector is not None:
+            clauses.append("sector = ?")
+            params.append(sector)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        with self._lock:
+            return self._conn.execute(query + " ORDER BY name", params).fetchall()
+
+    def changes_since(self, last_id=0):
+        """Companies added or updated after last_id, and the id to pass next time"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, name, ticker, market, sector FROM companies WHERE id > ? ORDER BY id",
+                (last_id,)
+            ).fetchall()
+        if rows:
+            last_id = rows[-1][0]
+        return [row[1:] for row in rows], last_id
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CompanyStore()
+    return _store
@@ -1,3 +1,5 @@
+import os
+
 MARKETS = {
     "Indian Market 🇮🇳": {
         "Technology": {
@@ -128,3 +130,44 @@ MARKETS = {
         }
     }
 }
+
+# Chart data reduction: series are downsampled (LTTB) to about
+# CHART_WIDTH_PX * POINTS_PER_PIXEL points each, and figures switch to WebGL
+# traces once the total point count passes WEBGL_THRESHOLD.
+CHART_WIDTH_PX = 1200
+POINTS_PER_PIXEL = 2
+WEBGL_THRESHOLD = 10_000
+
+# Correlation heatmap: cell text is dropped above HEATMAP_TEXT_THRESHOLD
+# companies, and above HEATMAP_MAX_SIZE the clustered matrix is shown as
+# block averages instead of individual cells.
+HEATMAP_TEXT_THRESHOLD = 20
+HEATMAP_MAX_SIZE = 100
+
+# Where prices come from: "yfinance" (cached locally), "parquet:<dir>",
+# "csv:<dir>" or "sqlite:<file>[#table]" for a local market data drop.
+PRICE_SOURCE = os.environ.get("PRICE_SOURCE", "yfinance")
+
+# Price panels are stored and analysed in this dtype; "float32" halves memory
+# per session at the cost of ~7 significant digits.
+PRICE_DTYPE = os.environ.get("PRICE_DTYPE", "float64")
+
+# Benchmarks offered for rolling beta / correlation
+BENCHMARKS = {
+    "S&P 500": "^GSPC",
+    "NIFTY 50": "^NSEI",
+    "Euro Stoxx 50": "^STOXX50E"
+}
+
+# Investment Performance rebalancing choices: (calendar, drift threshold)
+REBALANCE_POLICIES = {
+    "Buy and hold": (None, None),
+    "Monthly": ("monthly", None),
+    "Quarterly": ("quarterly", None),
+    "Yearly": ("yearly", None),
+    "When drift > 5%": (None, 0.05),
+    "Quarterly if drift > 5%": ("quarterly", 0.05)
+}
+
+# chat messages (question or answer) sent back to the Smart Advisor as history
+ADVISOR_HISTORY_TURNS = 6
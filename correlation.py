@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+from scipy.cluster.hierarchy import linkage, leaves_list
+from scipy.spatial.distance import squareform
+
+
+def correlation_matrix(returns, dtype=np.float32):
+    """Pearson correlation of return columns from one standardized matrix product"""
+    x = returns.to_numpy(dtype=dtype)
+    x = x - x.mean(axis=0)
+    std = x.std(axis=0, ddof=1)
+    std[std == 0] = np.nan  # flat series have no defined correlation
+    x /= std
+    corr = (x.T @ x) / (len(x) - 1)
+    np.fill_diagonal(corr, 1)
+    return pd.DataFrame(np.clip(corr, -1, 1), index=returns.columns, columns=returns.columns)
+
+
+def cluster_order(corr):
+    """Leaf order of an average-linkage clustering on the sqrt((1 - ρ) / 2) distance"""
+    n = len(corr)
+    if n < 3:
+        return np.arange(n)
+    dist = np.sqrt(np.clip((1 - np.nan_to_num(corr.to_numpy(dtype=float))) / 2, 0, 1))
+    np.fill_diagonal(dist, 0)
+    return leaves_list(linkage(squareform(dist, checks=False), method="average"))
+
+
+def reorder(corr, order):
+    return corr.iloc[order, order]
+
+
+def block_average(corr, n_blocks):
+    """Average correlation between contiguous groups of rows/columns (use on a clustered order)"""
+    n = len(corr)
+    if n <= n_blocks:
+        return corr
+    groups = np.array_split(np.arange(n), n_blocks)
+    labels = [f"{corr.index[g[0]]} … ({len(g)})" for g in groups]
+    starts = np.array([g[0] for g in groups])
+    values = corr.to_numpy(dtype=float)
+    # block sums via reduceat on both axes, then divide by block sizes
+    sums = np.add.reduceat(np.add.reduceat(values, starts, axis=0), starts, axis=1)
+    sizes = np.array([len(g) for g in groups])
+    return pd.DataFrame(sums / np.outer(sizes, sizes), index=labels, columns=labels)
+
+
+def top_pairs(corr, k=10, absolute=False, lowest=False):
+    """
+    The k most (or, with lowest=True, least) correlated distinct pairs,
+    via partial selection on the upper triangle instead of a full sort.
+    """
+    values = corr.to_numpy(dtype=float)
+    rows, cols = np.triu_indices(len(values), k=1)
+    upper = values[rows, cols]
+    score = np.abs(upper) if absolute else upper
+    score = np.nan_to_num(-score if lowest else score, nan=-np.inf)
+    k = min(k, len(upper))
+    if k == 0:
+        return pd.DataFrame(columns=["Company A", "Company B", "Correlation"])
+    best = np.argpartition(-score, k - 1)[:k]
+    best = best[np.argsort(-score[best])]
+    return pd.DataFrame({
+        "Company A": corr.index[rows[best]],
+        "Company B": corr.columns[cols[best]],
+        "Correlation": upper[best].round(3)
+    })
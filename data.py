@@ -1,31 +1,69 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
+from scipy.optimize import minimize
+from price_cache import get_history, period_to_range
+from providers import FIELDS, get_provider, normalize_ticker
+from returns_panel import as_panel
+from timing import timed
 
+def _history(tickers, start, end, fields):
+    provider = get_provider()
+    if provider.cacheable:
+        return get_history(tickers, start, end, provider)
+    # local sources are already fast, read them directly with projection
+    symbols = {t: normalize_ticker(t) for t in tickers}
+    frames = provider.download(list(dict.fromkeys(symbols.values())), start, end, fields)
+    empty = pd.DataFrame(columns=fields, index=pd.DatetimeIndex([], name="Date"), dtype=float)
+    return {t: frames.get(symbol, empty) for t, symbol in symbols.items()}
+
+@timed
 def fetch_stock_data(tickers, period):
-    data = yf.download(
-        tickers,
-        period=period,
-        group_by="ticker",
-        auto_adjust=True,
-        progress=False
-    )
-    return data
+    tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+    start, end = period_to_range(period)
+    history = _history(tickers, start, end, FIELDS)
+    return pd.concat(history, axis=1, names=["Ticker", "Price"])
+@timed
 def fetch_prices(tickers, start, end):
-    data = yf.download(
-        tickers,
-        start=start,
-        end=end,
-        auto_adjust=True,
-        progress=False
-    )
-    return data["Close"]
+    tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+    history = _history(tickers, start, end, ["Close"])
+    prices = pd.DataFrame({t: df["Close"] for t, df in history.items()})
+    prices.index.name = "Date"
+    return prices
+
+@timed
+def clean_prices(prices, dtype=np.float64):
+    """
+    Drop empty tickers, coerce to numbers and fill gaps. The values are
+    copied once into a column-major array of dtype (float32 halves memory)
+    and forward/back filled in place on that array.
+    """
+    non_numeric = [c for c, t in prices.dtypes.items() if not pd.api.types.is_numeric_dtype(t)]
+    if non_numeric:
+        prices = prices.assign(**{str(c): pd.to_numeric(prices[c], errors="coerce") for c in non_numeric})
+    values = np.asfortranarray(prices.to_numpy(dtype=dtype, na_value=np.nan))
+    valid = ~np.isnan(values)
+    keep = valid.any(axis=0)
+    if not keep.all():
+        values, valid = values[:, keep], valid[:, keep]
+
+    missing = ~valid
+    if missing.any():
+        # forward fill missing prices: each gap takes the last valid row above it
+        rows = np.arange(values.shape[0])[:, None]
+        source = np.maximum.accumulate(np.where(valid, rows, -1), axis=0)
+        # leading gaps have no row above, back fill them from the first valid row
+        source = np.where(source < 0, valid.argmax(axis=0), source)
+        r, c = np.nonzero(missing)
+        values[r, c] = values[source[r, c], c]
 
-def compute_statistics(price_df, risk_free_rate=0.06):
-    returns = np.log(price_df / price_df.shift(1)).dropna()
+    return pd.DataFrame(values, index=prices.index, columns=prices.columns[keep], copy=False)
 
-    avg_return = returns.mean()
-    volatility = returns.std()
+@timed
+def compute_statistics(panel, risk_free_rate=0.06):
+    panel = as_panel(panel)
+
+    avg_return = panel.mean
+    volatility = panel.std
 
     rf_daily = risk_free_rate / 252
     sharpe = (avg_return - rf_daily) / volatility
@@ -38,11 +76,12 @@ def compute_statistics(price_df, risk_free_rate=0.06):
 
     return stats.round(4)
 
-def compute_portfolio(price_df, weights):
-    returns = np.log(price_df / price_df.shift(1)).dropna()
+@timed
+def compute_portfolio(panel, weights):
+    panel = as_panel(panel)
 
     weight_array = np.array(weights)
-    portfolio_returns = returns.dot(weight_array)
+    portfolio_returns = panel.log_returns.dot(weight_array)
 
     avg_return = portfolio_returns.mean()
     volatility = portfolio_returns.std()
@@ -53,35 +92,267 @@ def compute_portfolio(price_df, weights):
         "Volatility": volatility,
         "Sharpe Ratio": sharpe
     }, portfolio_returns
-def stock_statistics(price_df):
-    stats = []
 
-    for col in price_df.columns:
-        prices = price_df[col].dropna()
-        returns = np.log(prices / prices.shift(1)).dropna()
+# bytes of T×chunk working arrays evaluate_portfolios may hold at once
+EVAL_MAX_BYTES = 16 * 1024 * 1024
+
+@timed
+def evaluate_portfolios(panel, weights, risk_free_rate=0.0, chunk_size=None, labels=None):
+    """
+    compute_portfolio for a K×N weight matrix in a few matrix products.
+    Average, volatility and Sharpe use daily log returns (from the mean /
+    covariance, no T×K pass); max drawdown and final value (growth of 1)
+    use simple returns with the weights held fixed daily, i.e. rebalanced
+    every day, so they differ from backtest()'s buy-and-hold or calendar
+    policies. Chunks of chunk_size portfolios keep the T×chunk arrays
+    bounded. With no return days both are NaN.
+    """
+    panel = as_panel(panel)
+    W = np.atleast_2d(np.asarray(weights, dtype=float))
+    mean = panel.mean.to_numpy(dtype=float)
+    cov = panel.cov.to_numpy(dtype=float)
+    simple_t = np.ascontiguousarray(panel.simple_returns.to_numpy(dtype=float).T)
+    if chunk_size is None:
+        chunk_size = max(1, EVAL_MAX_BYTES // (16 * max(simple_t.shape[1], 1)))
+
+    avg = W @ mean
+    volatility = np.sqrt(((W @ cov) * W).sum(axis=1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = (avg - risk_free_rate / 252) / volatility
+
+    max_drawdown = np.full(len(W), np.nan)
+    final_value = np.full(len(W), np.nan)
+    for start in range(0, len(W) if simple_t.shape[1] else 0, chunk_size):
+        chunk = slice(start, start + chunk_size)
+        # portfolio × day, so the running product / peak walk contiguous memory
+        growth = W[chunk] @ simple_t
+        growth += 1
+        np.cumprod(growth, axis=1, out=growth)
+        peak = np.maximum.accumulate(growth, axis=1)
+        np.divide(growth, peak, out=peak)
+        max_drawdown[chunk] = peak.min(axis=1) - 1
+        final_value[chunk] = growth[:, -1]
+
+    return pd.DataFrame({
+        "Avg Daily Return": avg,
+        "Volatility": volatility,
+        "Sharpe Ratio": sharpe,
+        "Max Drawdown": max_drawdown,
+        "Final Value (daily rebalanced)": final_value
+    }, index=labels)
+
+def portfolio_risk_score(portfolio_stats):
+    """0-100 blend of volatility and Sharpe ratio, higher is riskier"""
+    vol = portfolio_stats["Volatility"]
+    sharpe = portfolio_stats["Sharpe Ratio"]
+    vol_score = (vol - 0.005) / (0.03 - 0.005) * 100 #min-max scaling.
+    sharpe_score = (3 - sharpe) / 4 * 100
+    # Final risk score (weighted)
+    risk_score = 0.6 * vol_score + 0.4 * sharpe_score
+    return float(np.clip(risk_score, 0, 100))
+
+class _MeanVariance:
+    """
+    Mean / covariance of daily log returns with one Cholesky factor reused by
+    every solve. Solver failures are collected in failures; the affected
+    portfolio falls back to equal weights.
+    """
+
+    def __init__(self, panel):
+        panel = as_panel(panel)
+        self.columns = panel.columns
+        self.mean = panel.mean.to_numpy(dtype=float)
+        self.cov = panel.cov.to_numpy(dtype=float)
+        n = len(self.mean)
+        jitter = 1e-12 * np.trace(self.cov) / max(n, 1)
+        # tiny ridge keeps the factorization alive for near-duplicate tickers
+        self.chol = np.linalg.cholesky(self.cov + jitter * np.eye(n))
+        self.bounds = [(0.0, 1.0)] * n
+        self.failures = []
+        self._min_variance = None
+
+    def variance(self, w):
+        z = self.chol.T @ w
+        return z @ z, 2 * (self.chol @ z)
+
+    def solve(self, constraints, x0, bounds=None):
+        result = minimize(
+            self.variance,
+            x0,
+            jac=True,
+            method="SLSQP",
+            bounds=bounds or self.bounds,
+            constraints=constraints,
+            options={"ftol": 1e-12, "maxiter": 500}
+        )
+        if not result.success:
+            self.failures.append(result.message)
+            return None
+        return np.clip(result.x, 0, None)
+
+    def stats(self, w, rf_daily=0.0):
+        avg_return = w @ self.mean
+        volatility = np.sqrt(w @ self.cov @ w)
+        return {
+            "Avg Daily Return": avg_return,
+            "Volatility": volatility,
+            "Sharpe Ratio": (avg_return - rf_daily) / volatility
+        }
 
-        start_price = prices.iloc[0]
-        end_price = prices.iloc[-1]
-        days = len(prices)
+    def equal_weights(self):
+        return np.full(len(self.mean), 1 / len(self.mean))
 
+    def min_variance(self):
+        # solved once, both the min-variance optimum and the frontier start from it
+        if self._min_variance is None:
+            n = len(self.mean)
+            w = self.solve([{"type": "eq", "fun": lambda w: w.sum() - 1, "jac": lambda w: np.ones(n)}], self.equal_weights())
+            self._min_variance = self.equal_weights() if w is None else w / w.sum()
+        return self._min_variance.copy()
+
+    def max_sharpe(self, rf_daily=0.0):
+        excess = self.mean - rf_daily
+        if not (excess > 0).any():
+            # no asset beats the risk-free rate, the least-bad choice is min variance
+            return self.min_variance()
+        # convex form: min yᵀΣy  s.t. excessᵀy = 1, y >= 0, then w = y / sum(y)
+        n = len(self.mean)
+        y0 = np.where(excess > 0, excess, 0)
+        y0 = y0 / (y0 @ excess)
+        y = self.solve(
+            [{"type": "eq", "fun": lambda y: y @ excess - 1, "jac": lambda y: excess}],
+            y0,
+            bounds=[(0.0, None)] * n
+        )
+        if y is None:
+            return self.equal_weights()
+        return y / y.sum()
+
+
+def mean_variance(panel):
+    """Mean-variance model for a panel; an existing model is returned as is so callers can share one"""
+    return panel if isinstance(panel, _MeanVariance) else _MeanVariance(panel)
+
+@timed
+def optimize_portfolio(panel, objective="max_sharpe", risk_free_rate=0.0):
+    """
+    Long-only mean-variance optimum on daily log returns.
+    objective is "max_sharpe" or "min_variance". Returns (stats, weights).
+    panel may be a mean_variance() model to reuse its factorization.
+    """
+    mv = mean_variance(panel)
+    rf_daily = risk_free_rate / 252
+    if objective == "max_sharpe":
+        w = mv.max_sharpe(rf_daily)
+    elif objective == "min_variance":
+        w = mv.min_variance()
+    else:
+        raise ValueError(f"Unknown objective: {objective}")
+    return mv.stats(w, rf_daily), pd.Series(w, index=mv.columns)
+
+@timed
+def efficient_frontier(panel, points=50, risk_free_rate=0.0):
+    """
+    Long-only efficient frontier at `points` target returns between the
+    min-variance portfolio and the best single asset. Each point is
+    warm-started from the previous one; points the solver fails on are
+    left out. Returns (frontier_df, weights_df).
+    panel may be a mean_variance() model to reuse its factorization.
+    """
+    mv = mean_variance(panel)
+    rf_daily = risk_free_rate / 252
+    ones = np.ones(len(mv.mean))
+
+    w = mv.min_variance()
+    targets = np.linspace(w @ mv.mean, mv.mean.max(), points)
+    rows, weights = [], []
+    for target in targets:
+        solved = mv.solve([
+            {"type": "eq", "fun": lambda w: w.sum() - 1, "jac": lambda w: ones},
+            {"type": "eq", "fun": lambda w, t=target: w @ mv.mean - t, "jac": lambda w: mv.mean}
+        ], w)
+        if solved is None:
+            continue
+        w = solved / solved.sum()
+        rows.append({"Target Return": target, **mv.stats(w, rf_daily)})
+        weights.append(w)
+
+    frontier_df = pd.DataFrame(rows, columns=["Target Return", "Avg Daily Return", "Volatility", "Sharpe Ratio"])
+    return frontier_df, pd.DataFrame(weights, columns=mv.columns)
+def gap_log_returns(prices):
+    """
+    Log returns of a 2-D price array where each valid price is compared with
+    the previous valid price in its column. Returns (returns, has_return).
+    """
+    valid = ~np.isnan(prices)
+    rows = np.arange(prices.shape[0])[:, None]
+    cols = np.arange(prices.shape[1])
+    # row of the previous valid price for every cell
+    last_valid = np.maximum.accumulate(np.where(valid, rows, -1), axis=0)
+    prev = np.vstack([np.full((1, prices.shape[1]), -1), last_valid[:-1]])
+    has_return = valid & (prev >= 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(has_return, np.log(prices / prices[np.maximum(prev, 0), cols]), np.nan)
+    return returns, has_return
+
+def drawdown_state(returns, has_return, cumulative=1.0, peak=-np.inf):
+    """
+    Run the (1 + r) growth / peak recursion over new rows starting from a
+    previous state. Returns (cumulative, peak, max_drawdown) per column.
+    """
+    growth = cumulative * np.where(has_return, 1 + returns, 1).cumprod(axis=0)
+    running_peak = np.maximum(peak, np.maximum.accumulate(np.where(has_return, growth, -np.inf), axis=0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = np.where(has_return, growth / running_peak - 1, np.inf)
+    return growth[-1], running_peak[-1], drawdown.min(axis=0)
+
+def stock_stats_frame(columns, start_price, end_price, days, mean, volatility, max_drawdown):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = mean / volatility
         total_return = (end_price - start_price) / start_price
         annual_return = (1 + total_return) ** (252 / days) - 1 #Shows what the return would be if this performance continued for a full year.
-        volatility = returns.std()
-        sharpe = returns.mean() / volatility
-
-        cumulative = (1 + returns).cumprod()
-        max_drawdown = (cumulative / cumulative.cummax() - 1).min() #.mean() gets the lowest negative value, which represents the worst drawdown experienced by the stock during the period.
-
-        stats.append({
-            "Company": col,
-            "Start Price": round(start_price, 2),
-            "End Price": round(end_price, 2),
-            "Total Return %": round(total_return * 100, 2),
-            "Annual Return %": round(annual_return * 100, 2),
-            "Volatility": round(volatility, 4),
-            "Sharpe Ratio": round(sharpe, 4),
-            "Max Drawdown %": round(max_drawdown * 100, 2),
-            "Days": days
-        })
-
-    return pd.DataFrame(stats)
+    return pd.DataFrame({
+        "Company": columns,
+        "Start Price": np.round(start_price, 2),
+        "End Price": np.round(end_price, 2),
+        "Total Return %": np.round(total_return * 100, 2),
+        "Annual Return %": np.round(annual_return * 100, 2),
+        "Volatility": np.round(volatility, 4),
+        "Sharpe Ratio": np.round(sharpe, 4),
+        "Max Drawdown %": np.round(max_drawdown * 100, 2),
+        "Days": days
+    })
+
+@timed
+def stock_statistics(panel):
+    """
+    Per-company statistics computed for all columns at once. Each column
+    keeps its own first/last valid price and, like dropna, returns bridge
+    over missing days instead of treating them as flat.
+    """
+    price_df = as_panel(panel).prices.dropna(axis=1, how="all")
+    prices = price_df.to_numpy(dtype=float)
+    valid = ~np.isnan(prices)
+    cols = np.arange(prices.shape[1])
+
+    first = valid.argmax(axis=0)
+    last = prices.shape[0] - 1 - valid[::-1].argmax(axis=0)
+    returns, has_return = gap_log_returns(prices)
+
+    n = has_return.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.nansum(returns, axis=0) / n
+        volatility = np.sqrt(np.nansum((returns - mean) ** 2, axis=0) / (n - 1))
+    volatility[n < 2] = np.nan
+    _, _, max_drawdown = drawdown_state(returns, has_return) #worst (most negative) drawdown experienced by the stock during the period.
+    max_drawdown[n == 0] = np.nan
+
+    return stock_stats_frame(
+        price_df.columns,
+        prices[first, cols],
+        prices[last, cols],
+        valid.sum(axis=0),
+        mean,
+        volatility,
+        max_drawdown
+    )
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets over columns that share one x axis.
+    x is (T,), y is (T, N); returns an (n_out, N) array of selected rows per
+    column, always keeping the first and last point.
+    """
+    T, N = y.shape
+    if n_out >= T or n_out < 3:
+        return np.tile(np.arange(T)[:, None], (1, N))
+
+    cols = np.arange(N)
+    edges = np.linspace(1, T - 1, n_out - 1).astype(int)  # n_out - 2 inner buckets
+    out = np.empty((n_out, N), dtype=int)
+    out[0] = 0
+    out[-1] = T - 1
+    a = np.zeros(N, dtype=int)
+
+    # one step per bucket, vectorized over every series at once
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i == n_out - 3:
+            avg_x, avg_y = x[-1], y[-1]
+        else:
+            nxt = edges[i + 2]
+            avg_x, avg_y = x[hi:nxt].mean(), y[hi:nxt].mean(axis=0)
+        ax, ay = x[a], y[a, cols]
+        area = np.abs((ax - avg_x) * (y[lo:hi] - ay) - (ax - x[lo:hi, None]) * (avg_y - ay))
+        a = lo + area.argmax(axis=0)
+        out[i + 1] = a
+    return out
+
+
+def reduce_frame(df, n_out, value_name="Value", var_name="Series"):
+    """
+    Downsample every column of a date-indexed frame to at most n_out points
+    and return it in long form (index name, var_name, value_name).
+    """
+    index_name = df.index.name or "index"
+    y = df.to_numpy(dtype=float)
+    if len(df) <= n_out:
+        # built directly rather than with melt, which refuses a value_name
+        # that is also a column label
+        rows = np.broadcast_to(np.arange(len(df))[:, None], y.shape)
+    else:
+        x = df.index.to_numpy()
+        x = x.astype("int64").astype(float) if np.issubdtype(x.dtype, np.datetime64) else x.astype(float)
+        rows = lttb_indices(x, y, n_out)
+    cols = np.broadcast_to(np.arange(y.shape[1]), rows.shape)
+    return pd.DataFrame({
+        index_name: df.index.to_numpy()[rows.T.ravel()],
+        var_name: np.repeat(df.columns.to_numpy(), len(rows)),
+        value_name: y[rows, cols].T.ravel()
+    })
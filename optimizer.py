@@ -0,0 +1,33 @@
+import numpy as np
+from returns_panel import as_panel
+from timing import timed
+
+DEFAULT_SAMPLES = 100_000
+CHUNK_SIZE = 50_000  # weight rows evaluated per matrix product
+
+
+def _batches(panel, num_portfolios, seed, chunk_size):
+    # mean / covariance come from the panel once, each chunk is a few matrix products
+    mean = panel.mean.to_numpy()
+    cov = panel.cov.to_numpy()
+    rng = np.random.default_rng(seed)
+
+    for start in range(0, num_portfolios, chunk_size):
+        w = rng.random((min(chunk_size, num_portfolios - start), len(mean)))
+        w /= w.sum(axis=1, keepdims=True)
+        port_returns = w @ mean
+        # diag(W Σ Wᵀ) without building the K×K matrix
+        port_vols = np.sqrt(np.einsum("ij,ij->i", w @ cov, w))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpes = np.where(port_vols != 0, port_returns / port_vols, 0)
+        yield w, port_returns, port_vols, sharpes
+
+
+@timed
+def random_portfolios(panel, num_portfolios=DEFAULT_SAMPLES, seed=None, chunk_size=CHUNK_SIZE):
+    """
+    Evaluate num_portfolios random long-only weight vectors on daily log returns.
+    Returns (weights, port_returns, port_vols, sharpes) as numpy arrays.
+    """
+    batches = list(_batches(as_panel(panel), num_portfolios, seed, chunk_size))
+    return tuple(np.concatenate(parts) for parts in zip(*batches))
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from data import fetch_prices, clean_prices
+from price_cache import CACHE_DIR, REFRESH_SECONDS
+
+# Cleaned price panels as memory-mapped, column-major .npy files. Every
+# session/process that opens the same panel shares the same page-cache
+# pages read-only instead of holding its own copy.
+PANEL_DIR = os.path.join(CACHE_DIR, "panels")
+
+
+def panel_key(tickers, start, end, dtype):
+    payload = json.dumps([sorted(tickers), str(start), str(end), np.dtype(dtype).name])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _paths(key):
+    base = os.path.join(PANEL_DIR, key)
+    return base + ".values.npy", base + ".index.npy", base + ".json"
+
+
+def write_panel(key, prices, complete=True):
+    """
+    Persist a cleaned price frame; values are stored column-major.
+    complete=False marks a panel missing some requested tickers, which is
+    only reused until REFRESH_SECONDS have passed.
+    """
+    os.makedirs(PANEL_DIR, exist_ok=True)
+    values_path, index_path, meta_path = _paths(key)
+    tmp = f".{os.getpid()}.{uuid.uuid4().hex}.tmp"  # unique per writer, threads included
+
+    values = np.lib.format.open_memmap(
+        values_path + tmp, mode="w+", dtype=prices.to_numpy().dtype,
+        shape=prices.shape, fortran_order=True
+    )
+    values[:] = prices.to_numpy()
+    values.flush()
+    del values
+    with open(index_path + tmp, "wb") as f:
+        np.save(f, prices.index.to_numpy(dtype="datetime64[ns]"))
+    with open(meta_path + tmp, "w") as f:
+        json.dump({"columns": list(prices.columns), "built_at": time.time(), "complete": complete}, f)
+
+    # metadata last: a reader never sees new metadata with old values
+    os.replace(values_path + tmp, values_path)
+    os.replace(index_path + tmp, index_path)
+    os.replace(meta_path + tmp, meta_path)
+
+
+def open_panel(key, columns=None):
+    """Read-only DataFrame backed by the memory-mapped file (no data copy)"""
+    values_path, index_path, meta_path = _paths(key)
+    with open(meta_path, "r") as f:
+        meta = json.load(f)
+    values = np.load(values_path, mmap_mode="r")
+    index = pd.DatetimeIndex(np.load(index_path), name="Date")
+    return pd.DataFrame(values, index=index, columns=columns or meta["columns"], copy=False)
+
+
+def _is_fresh(key, end):
+    meta_path = _paths(key)[2]
+    if not os.path.exists(meta_path):
+        return False
+    with open(meta_path, "r") as f:
+        meta = json.load(f)
+    if pd.Timestamp(end) <= pd.Timestamp.today().normalize() and meta.get("complete", False):
+        return True  # fully historical with every ticker present, never changes
+    # live or missing tickers (possibly a failed download): rebuild once stale
+    return time.time() - meta["built_at"] <= REFRESH_SECONDS
+
+
+def shared_panel(tickers, start, end, dtype=np.float64):
+    """Cleaned prices for tickers, built once and then memory-mapped from disk"""
+    key = panel_key(tickers, start, end, dtype)
+    if not _is_fresh(key, end):
+        # stored sorted by ticker, whichever session's selection order built it
+        prices = clean_prices(fetch_prices(sorted(set(tickers)), start, end), dtype)
+        # clean_prices drops tickers that came back empty or all-NaN
+        complete = len(prices) > 0 and prices.shape[1] == len(set(tickers))
+        write_panel(key, prices, complete)
+    return open_panel(key)
+
+
+def select_named(prices, tickers, names):
+    """
+    Columns for tickers, labelled names, in the frame's own column order
+    rather than the order given. A view (no copy) whenever the selected
+    columns are one contiguous block, else a copy (a ticker may appear twice).
+    """
+    positions = prices.columns.get_indexer(tickers)
+    order = np.argsort(positions, kind="stable")
+    positions, names = positions[order], [names[i] for i in order]
+    first = positions[0] if len(positions) else 0
+    if (positions == np.arange(first, first + len(positions))).all():
+        values = prices.to_numpy()[:, first:first + len(positions)]
+    else:
+        values = prices.to_numpy()[:, positions]
+    return pd.DataFrame(values, index=prices.index, columns=names, copy=False)
@@ -0,0 +1,165 @@
+import json
+import os
+import threading
+import time
+import uuid
+
+import pandas as pd
+
+from providers import FIELDS, YFinanceProvider, normalize_ticker, ticker_filename
+
+# On-disk price store: one Parquet file per ticker (OHLCV keyed by date) plus
+# a small JSON index recording which date range has already been requested
+# from the remote provider. The index is what stops weekends/holidays from looking like gaps.
+CACHE_DIR = os.environ.get("PRICE_CACHE_DIR", ".price_cache")
+INDEX_FILE = "index.json"
+REFRESH_SECONDS = 15 * 60  # today's bar keeps moving while the market is open
+
+PERIODS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+EARLIEST = pd.Timestamp("1900-01-01")
+
+# sessions share one process: serializes the index / ticker file read-modify-writes
+_lock = threading.Lock()
+
+
+def _today():
+    return pd.Timestamp.today().normalize()
+
+
+def period_to_range(period):
+    """Translate a yfinance period string into a [start, end) date range"""
+    end = _today() + pd.Timedelta(days=1)
+    if period == "max":
+        return EARLIEST, end
+    if period == "ytd":
+        return pd.Timestamp(year=end.year, month=1, day=1), end
+    if period not in PERIODS:
+        raise ValueError(f"Unsupported period: {period}")
+    return _today() - PERIODS[period], end
+
+
+def _ticker_path(ticker):
+    return os.path.join(CACHE_DIR, ticker_filename(ticker, "parquet"))
+
+
+def _atomic_write(path, write):
+    tmp = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"  # unique per writer, threads included
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _load_index():
+    path = os.path.join(CACHE_DIR, INDEX_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _save_index(index):
+    def write(tmp):
+        with open(tmp, "w") as f:
+            json.dump(index, f, indent=2)
+    _atomic_write(os.path.join(CACHE_DIR, INDEX_FILE), write)
+
+
+def load_ticker(ticker):
+    path = _ticker_path(ticker)
+    if not os.path.exists(path):
+        return None
+    return pd.read_parquet(path)
+
+
+def _store_ticker(ticker, new_rows):
+    old = load_ticker(ticker)
+    if old is not None and not old.empty:
+        new_rows = pd.concat([old, new_rows])
+        new_rows = new_rows[~new_rows.index.duplicated(keep="last")]
+    new_rows = new_rows.sort_index()
+    _atomic_write(_ticker_path(ticker), lambda tmp: new_rows.to_parquet(tmp))
+
+
+def _missing_ranges(coverage, start, end, now):
+    """Date ranges in [start, end) that have not been requested yet"""
+    if coverage is None:
+        return [(start, end)]
+
+    covered_start = pd.Timestamp(coverage["start"])
+    covered_end = pd.Timestamp(coverage["end"])
+    gaps = []
+    if start < covered_start:
+        gaps.append((start, covered_start))
+    # coverage stops at today while today's bar is live; refetch it once stale
+    live = covered_end >= _today() and now - coverage.get("fetched_at", 0) <= REFRESH_SECONDS
+    if end > covered_end and not live:
+        gaps.append((covered_end, end))
+    return gaps
+
+
+def get_history(tickers, start, end, provider=None):
+    """
+    Return {ticker: OHLCV frame} for [start, end), reading the local store
+    first and downloading only tickers / date ranges that were never fetched.
+    Tickers are stored and requested under normalize_ticker(); the result
+    keeps the caller's spelling.
+    """
+    provider = provider or YFinanceProvider()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    start = EARLIEST if start is None else pd.Timestamp(start)
+    end = _today() + pd.Timedelta(days=1) if end is None else pd.Timestamp(end)
+    now = time.time()
+    index = _load_index()
+
+    symbols = {ticker: normalize_ticker(ticker) for ticker in tickers}
+    # group identical gaps so new tickers share one download call
+    pending = {}
+    for ticker in dict.fromkeys(symbols.values()):
+        # coverage without its file (deleted, or stored under an older name) counts as none
+        coverage = index.get(ticker) if os.path.exists(_ticker_path(ticker)) else None
+        for gap in _missing_ranges(coverage, start, end, now):
+            pending.setdefault(gap, []).append(ticker)
+
+    fetched = []
+    for (gap_start, gap_end), gap_tickers in pending.items():
+        frames = provider.download(gap_tickers, gap_start, gap_end)
+        for ticker in gap_tickers:
+            # an empty result may be a transient failure, so it is not
+            # recorded as covered and the range is tried again next time
+            if ticker in frames and not frames[ticker].empty:
+                with _lock:
+                    _store_ticker(ticker, frames[ticker])
+                fetched.append((ticker, gap_start, gap_end))
+
+    if fetched:
+        with _lock:
+            # reread so coverage written by other sessions meanwhile is kept
+            index = _load_index()
+            for ticker, gap_start, gap_end in fetched:
+                coverage = index.get(ticker)
+                covered_start = gap_start if coverage is None else min(gap_start, pd.Timestamp(coverage["start"]))
+                covered_end = gap_end if coverage is None else max(gap_end, pd.Timestamp(coverage["end"]))
+                index[ticker] = {
+                    "start": covered_start.isoformat(),
+                    # never mark today as final, the bar is still being written
+                    "end": min(covered_end, _today()).isoformat(),
+                    "fetched_at": now
+                }
+            _save_index(index)
+
+    history = {}
+    for ticker, symbol in symbols.items():
+        df = load_ticker(symbol)
+        if df is None:
+            df = pd.DataFrame(columns=FIELDS, index=pd.DatetimeIndex([], name="Date"))
+        history[ticker] = df.loc[(df.index >= start) & (df.index < end)]
+    return history
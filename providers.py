@@ -0,0 +1,162 @@
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from contextlib import closing
+from urllib.parse import quote
+
+import pandas as pd
+import yfinance as yf
+
+from config import PRICE_SOURCE
+
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def normalize_ticker(ticker):
+    """The one spelling of a symbol used by every provider and the price cache"""
+    return str(ticker).strip().upper()
+
+
+def ticker_filename(ticker, ext):
+    """File name holding a ticker's bars; "^" and "=" (indices, FX) stay readable"""
+    return f"{quote(normalize_ticker(ticker), safe='=^')}.{ext}"
+
+
+class PriceProvider(ABC):
+    """
+    Source of daily OHLCV bars. download() returns {ticker: frame} with a
+    "Date" index and the requested fields, for dates in [start, end).
+    """
+
+    # remote sources go through the local Parquet cache, local ones are read directly
+    cacheable = True
+
+    @abstractmethod
+    def download(self, tickers, start, end, fields=FIELDS):
+        """tickers are already normalized with normalize_ticker()"""
+
+
+class YFinanceProvider(PriceProvider):
+    def download(self, tickers, start, end, fields=FIELDS):
+        data = yf.download(
+            tickers,
+            start=start,
+            end=end,
+            group_by="ticker",
+            auto_adjust=True,
+            progress=False
+        )
+        frames = {}
+        for ticker in tickers:
+            if isinstance(data.columns, pd.MultiIndex):
+                if ticker not in data.columns.get_level_values(0):
+                    continue
+                df = data[ticker]
+            else:
+                df = data
+            df = df.reindex(columns=fields).dropna(how="all")
+            df.index = pd.DatetimeIndex(df.index).tz_localize(None)
+            df.index.name = "Date"
+            frames[ticker] = df
+        return frames
+
+
+class LocalFileProvider(PriceProvider):
+    """
+    One file per ticker in a directory (<ticker>.parquet or <ticker>.csv)
+    with a Date column/index and OHLCV columns. Parquet reads push the
+    column projection and the date range down to pyarrow.
+    """
+
+    cacheable = False
+
+    def __init__(self, directory, fmt="parquet", date_column="Date"):
+        self.directory = directory
+        self.fmt = fmt
+        self.date_column = date_column
+
+    def _path(self, ticker):
+        return os.path.join(self.directory, ticker_filename(ticker, self.fmt))
+
+    def _read(self, path, start, end, fields):
+        if self.fmt == "parquet":
+            df = pd.read_parquet(
+                path,
+                columns=fields,
+                filters=[(self.date_column, ">=", start), (self.date_column, "<", end)]
+            )
+            if self.date_column in df.columns:
+                df = df.set_index(self.date_column)
+        else:
+            df = pd.read_csv(
+                path,
+                usecols=lambda c: c == self.date_column or c in fields,
+                parse_dates=[self.date_column],
+                index_col=self.date_column
+            )
+            df = df.loc[(df.index >= start) & (df.index < end)]
+        df.index = pd.DatetimeIndex(df.index, name="Date")
+        return df.reindex(columns=fields).sort_index()
+
+    def download(self, tickers, start, end, fields=FIELDS):
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        frames = {}
+        for ticker in tickers:
+            path = self._path(ticker)
+            if os.path.exists(path):
+                frames[ticker] = self._read(path, start, end, fields)
+        return frames
+
+
+class SQLiteProvider(PriceProvider):
+    """
+    A table of (Ticker, Date, Open, High, Low, Close, Volume) rows with ISO
+    dates. Only the requested tickers, dates and columns leave SQLite.
+    """
+
+    cacheable = False
+
+    def __init__(self, path, table="prices"):
+        self.path = path
+        self.table = table
+
+    def download(self, tickers, start, end, fields=FIELDS):
+        placeholders = ",".join("?" * len(tickers))
+        columns = ", ".join(f'"{f}"' for f in fields)
+        query = (
+            f'SELECT "Ticker", "Date", {columns} FROM "{self.table}" '
+            f'WHERE "Ticker" IN ({placeholders}) AND "Date" >= ? AND "Date" < ? ORDER BY "Date"'
+        )
+        params = list(tickers) + [pd.Timestamp(start).strftime("%Y-%m-%d"), pd.Timestamp(end).strftime("%Y-%m-%d")]
+        with closing(sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)) as conn:
+            rows = pd.read_sql_query(query, conn, params=params, parse_dates=["Date"])
+
+        frames = {}
+        for ticker, df in rows.groupby("Ticker", sort=False):
+            frames[ticker] = df.set_index("Date")[fields]
+        return frames
+
+
+def provider_from_spec(spec):
+    """
+    "yfinance", "parquet:<dir>", "csv:<dir>" or "sqlite:<file>[#table]"
+    """
+    kind, _, target = spec.partition(":")
+    if kind == "yfinance":
+        return YFinanceProvider()
+    if kind in ("parquet", "csv"):
+        return LocalFileProvider(target, fmt=kind)
+    if kind == "sqlite":
+        path, _, table = target.partition("#")
+        return SQLiteProvider(path, table or "prices")
+    raise ValueError(f"Unknown price source: {spec}")
+
+
+_provider = None
+
+
+def get_provider():
+    global _provider
+    if _provider is None:
+        _provider = provider_from_spec(PRICE_SOURCE)
+    return _provider
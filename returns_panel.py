@@ -0,0 +1,80 @@
+from functools import cached_property
+
+import numpy as np
+
+from correlation import correlation_matrix
+
+
+class ReturnsPanel:
+    """
+    A price frame plus everything derived from it. Each quantity is computed
+    on first access and memoized, so one rerun does every O(T·N) / O(T·N²)
+    pass at most once no matter how many functions and charts use it.
+    """
+
+    def __init__(self, prices):
+        self.prices = prices
+
+    @property
+    def columns(self):
+        return self.prices.columns
+
+    @cached_property
+    def log_returns(self):
+        return np.log(self.prices / self.prices.shift(1)).dropna()
+
+    @cached_property
+    def simple_returns(self):
+        return self.prices.pct_change().dropna()
+
+    @cached_property
+    def mean(self):
+        """Average daily log return per column"""
+        return self.log_returns.mean()
+
+    @cached_property
+    def std(self):
+        return self.log_returns.std()
+
+    @cached_property
+    def cov(self):
+        return self.log_returns.cov()
+
+    @cached_property
+    def corr(self):
+        """float32 log-return correlation"""
+        return correlation_matrix(self.log_returns)
+
+    @cached_property
+    def cumulative(self):
+        """Growth of 1 invested in each column"""
+        return (1 + self.simple_returns).cumprod()
+
+    @cached_property
+    def normalized(self):
+        """Prices rebased to 100 at each column's first row"""
+        return self.prices / self.prices.iloc[0] * 100
+
+    @cached_property
+    def _complete(self):
+        return not self.prices.isna().to_numpy().any()
+
+    def select(self, columns):
+        """Sub-panel for a subset of columns, reusing anything already computed"""
+        columns = list(columns)
+        sub = ReturnsPanel(self.prices[columns])
+        if not self._complete:
+            # dropna-based returns depend on which columns are present
+            return sub
+        for name in ("log_returns", "simple_returns", "mean", "std", "cumulative", "normalized"):
+            if name in self.__dict__:
+                sub.__dict__[name] = self.__dict__[name][columns]
+        for name in ("cov", "corr"):
+            if name in self.__dict__:
+                sub.__dict__[name] = self.__dict__[name].loc[columns, columns]
+        return sub
+
+
+def as_panel(data):
+    """Accept either a ReturnsPanel or a raw price frame"""
+    return data if isinstance(data, ReturnsPanel) else ReturnsPanel(data)
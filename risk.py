@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+from returns_panel import as_panel
+from timing import timed
+
+CONFIDENCE_LEVELS = (0.95, 0.99)
+HORIZONS = (1, 10)
+METHODS = ("historical", "parametric", "monte_carlo")
+MC_PATHS = 20_000
+CHUNK_SIZE = 500  # portfolios priced per Monte Carlo chunk
+
+# VaR and ES are positive fractions of portfolio value lost over the horizon.
+# Portfolio daily log returns are weights · asset log returns, as in
+# compute_portfolio; h-day returns are sums of h daily log returns.
+
+
+def _weights(weights):
+    return np.atleast_2d(np.asarray(weights, dtype=float))
+
+
+def _nan(confidence, k):
+    return np.full((len(confidence), k), np.nan), np.full((len(confidence), k), np.nan)
+
+
+def _tail(losses, confidence):
+    """
+    VaR and ES per column of a losses array (scenarios × portfolios) with
+    one partial sort: after np.partition everything past the k-th row is at
+    least the k-th loss, so ES is just the mean of that slice.
+    """
+    m = len(losses)
+    if m == 0:
+        return _nan(confidence, losses.shape[1])
+    ks = [min(m - 1, max(0, int(np.ceil(c * m)) - 1)) for c in confidence]
+    part = np.partition(losses, sorted(set(ks)), axis=0)
+    var = np.array([part[k] for k in ks])
+    es = np.array([part[k:].mean(axis=0) for k in ks])
+    return var, es
+
+
+def _historical(daily, confidence, horizons):
+    # overlapping h-day windows from one cumulative sum
+    cs = np.vstack([np.zeros((1, daily.shape[1])), np.cumsum(daily, axis=0)])
+    for h in horizons:
+        yield h, _tail(-np.expm1(cs[h:] - cs[:-h]), confidence)
+
+
+def _parametric(daily, confidence, horizons):
+    if len(daily) < 2:
+        for h in horizons:
+            yield h, _nan(confidence, daily.shape[1])
+        return
+    mean = daily.mean(axis=0)
+    std = daily.std(axis=0, ddof=1)
+    for h in horizons:
+        m, s = h * mean, np.sqrt(h) * std
+        z = norm.ppf(1 - np.asarray(confidence))[:, None]
+        var = -np.expm1(m + s * z)
+        # E[exp(X) | X <= q] for X ~ N(m, s²) gives the lognormal ES in closed form
+        tail_mean = np.exp(m + s ** 2 / 2) * norm.cdf(z - s) / (1 - np.asarray(confidence))[:, None]
+        yield h, (var, 1 - tail_mean)
+
+
+def _monte_carlo(assets, W, confidence, horizons, paths, seed, chunk_size):
+    """
+    Bootstrap h-day paths from whole historical days (all holdings move
+    together). Draws are summed per asset first, then one matrix product
+    prices every portfolio, which all see the same paths.
+    """
+    if len(assets) == 0:
+        for h in horizons:
+            yield h, _nan(confidence, len(W))
+        return
+    rng = np.random.default_rng(seed)
+    days = rng.integers(0, len(assets), (paths, max(horizons)))
+    total = np.zeros((paths, assets.shape[1]))
+    for d in range(max(horizons)):
+        total += assets[days[:, d]]
+        if d + 1 not in horizons:
+            continue
+        var, es = [], []
+        for start in range(0, len(W), chunk_size):
+            v, e = _tail(-np.expm1(total @ W[start:start + chunk_size].T), confidence)
+            var.append(v)
+            es.append(e)
+        yield d + 1, (np.hstack(var), np.hstack(es))
+
+
+@timed
+def risk_report(panel, weights, confidence=CONFIDENCE_LEVELS, horizons=HORIZONS, methods=METHODS,
+                labels=None, paths=MC_PATHS, seed=0, chunk_size=CHUNK_SIZE):
+    """
+    VaR and Expected Shortfall for one (N) or many (K×N) weight vectors at
+    every confidence level, horizon (trading days) and method. Returns a
+    long frame: Portfolio, Method, Confidence, Horizon, VaR, ES. Horizons
+    longer than the available history get NaN instead of extrapolating.
+    """
+    W = _weights(weights)
+    assets = as_panel(panel).log_returns.to_numpy(dtype=float)
+    daily = assets @ W.T  # day × portfolio
+    if labels is None:
+        labels = [f"Portfolio {k + 1}" for k in range(len(W))]
+
+    frames = []
+    for method in methods:
+        if method == "historical":
+            results = _historical(daily, confidence, horizons)
+        elif method == "parametric":
+            results = _parametric(daily, confidence, horizons)
+        elif method == "monte_carlo":
+            results = _monte_carlo(assets, W, confidence, horizons, paths, seed, chunk_size)
+        else:
+            raise ValueError(f"Unknown VaR method: {method}")
+        for h, (var, es) in results:
+            if h > len(daily):
+                var, es = _nan(confidence, len(W))
+            for i, c in enumerate(confidence):
+                frames.append(pd.DataFrame({
+                    "Portfolio": labels,
+                    "Method": method,
+                    "Confidence": c,
+                    "Horizon": h,
+                    "VaR": var[i],
+                    "ES": es[i]
+                }))
+    return pd.concat(frames, ignore_index=True)
+
+
+@timed
+def component_var(panel, weights, confidence=0.95, horizon=1):
+    """
+    Euler decomposition of delta-normal VaR for one portfolio: each
+    holding's weight × marginal VaR. Components sum to the portfolio's
+    linear VaR, -(h·mean) + z·sqrt(h)·volatility of its log returns.
+    """
+    panel = as_panel(panel)
+    w = np.asarray(weights, dtype=float)
+    mean = panel.mean.to_numpy(dtype=float)
+    cov = panel.cov.to_numpy(dtype=float)
+    z = norm.ppf(confidence)
+    sigma = np.sqrt(w @ cov @ w)
+    marginal = -horizon * mean + z * np.sqrt(horizon) * (cov @ w) / sigma
+    component = w * marginal
+    return pd.DataFrame({
+        "Weight": w,
+        "Marginal VaR": marginal,
+        "Component VaR": component,
+        "Contribution %": component / component.sum() * 100
+    }, index=panel.columns)
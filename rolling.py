@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from returns_panel import as_panel
+
+
+def _window_sums(x, window):
+    """
+    Trailing window sums along axis 0 from one cumulative sum, O(T) for any
+    window length. Rows before the first full window are NaN.
+    """
+    cs = np.cumsum(x, axis=0)
+    out = np.full(x.shape, np.nan)
+    if len(x) < window:
+        return out
+    out[window - 1] = cs[window - 1]
+    out[window:] = cs[window:] - cs[:-window]
+    return out
+
+
+def _centered(returns):
+    # shifting by the full-period mean leaves (co)variances unchanged and
+    # keeps the cumulative sums small, which avoids cancellation
+    x = returns.to_numpy(dtype=float)
+    return x - x.mean(axis=0)
+
+
+def _moments(x, window):
+    s1 = _window_sums(x, window)
+    s2 = _window_sums(x * x, window)
+    mean = s1 / window
+    var = np.maximum(s2 - s1 * mean, 0) / (window - 1)
+    return mean, var
+
+
+def rolling_volatility(panel, window=63):
+    returns = as_panel(panel).log_returns
+    _, var = _moments(_centered(returns), window)
+    return pd.DataFrame(np.sqrt(var), index=returns.index, columns=returns.columns)
+
+
+def rolling_sharpe(panel, window=63, risk_free_rate=0.0):
+    """Trailing mean / volatility of daily log returns (risk_free_rate is annual)"""
+    returns = as_panel(panel).log_returns
+    x = returns.to_numpy(dtype=float)
+    offset = x.mean(axis=0)
+    mean, var = _moments(x - offset, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = (mean + offset - risk_free_rate / 252) / np.sqrt(var)
+    return pd.DataFrame(sharpe, index=returns.index, columns=returns.columns)
+
+
+def rolling_beta(panel, benchmark_returns, window=63):
+    """Trailing beta of every column to a benchmark return series"""
+    returns = as_panel(panel).log_returns
+    bench = benchmark_returns.reindex(returns.index).fillna(0).to_numpy(dtype=float)
+    x = _centered(returns)
+    b = (bench - bench.mean())[:, None]
+    sx = _window_sums(x, window)
+    sb = _window_sums(b, window)
+    sxb = _window_sums(x * b, window)
+    sbb = _window_sums(b * b, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta = (sxb - sx * sb / window) / (sbb - sb * sb / window)
+    return pd.DataFrame(beta, index=returns.index, columns=returns.columns)
+
+
+def rolling_correlation(panel, window=63, pairs=None):
+    """
+    Trailing correlation for (a, b) column pairs, every pair by default.
+    All pairs are computed together from cumulative sums of products.
+    """
+    returns = as_panel(panel).log_returns
+    columns = list(returns.columns)
+    if pairs is None:
+        pairs = [(a, b) for i, a in enumerate(columns) for b in columns[i + 1:]]
+    x = _centered(returns)
+    left = x[:, [columns.index(a) for a, _ in pairs]]
+    right = x[:, [columns.index(b) for _, b in pairs]]
+
+    _, var_l = _moments(left, window)
+    _, var_r = _moments(right, window)
+    sl = _window_sums(left, window)
+    sr = _window_sums(right, window)
+    cov = (_window_sums(left * right, window) - sl * sr / window) / (window - 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = np.clip(cov / np.sqrt(var_l * var_r), -1, 1)
+    return pd.DataFrame(corr, index=returns.index, columns=[f"{a} / {b}" for a, b in pairs])
@@ -0,0 +1,137 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+
+from returns_panel import as_panel
+from timing import timed
+
+DEFAULT_PATHS = 10_000
+CHUNK_SIZE = 2_000
+BINS = 1_000           # histogram bins per simulated day
+SPREAD = 8             # bins cover mean ± SPREAD standard deviations of log growth
+PERCENTILES = (5, 25, 50, 75, 95)
+ZERO_VOL = 1e-12       # daily log return std below this is rounding noise, not risk
+
+
+def _chunk_counts(task):
+    """
+    Simulate one chunk of paths and reduce it to per-day histogram counts of
+    log growth, the number of losing paths and the sum of final growth.
+    """
+    method, mean, std, history, paths, horizon, seed, lo, width = task
+    rng = np.random.default_rng(seed)
+    if method == "normal":
+        daily = rng.normal(mean, std, (paths, horizon))
+    else:
+        daily = history[rng.integers(0, len(history), (paths, horizon))]
+    log_growth = np.cumsum(daily, axis=1)
+
+    bins = np.clip(((log_growth - lo) / width).astype(np.int64), 0, BINS - 1)
+    bins += np.arange(horizon) * BINS
+    counts = np.bincount(bins.ravel(), minlength=horizon * BINS)
+    final = log_growth[:, -1]
+    return counts, int((final < 0).sum()), float(np.exp(final).sum())
+
+
+def _windowed_map(pool, tasks, window):
+    """pool.map in windows of tasks, so at most a window of chunk histograms is held before merging"""
+    for start in range(0, len(tasks), window):
+        yield from pool.map(_chunk_counts, tasks[start:start + window])
+
+
+def _percentiles(counts, lo, width, percentiles):
+    """Percentiles of each day's log growth, interpolated inside the histogram bins"""
+    cum = np.cumsum(counts, axis=1)
+    total = cum[:, -1:]
+    out = np.empty((len(counts), len(percentiles)))
+    for j, p in enumerate(percentiles):
+        target = total[:, 0] * p / 100
+        b = (cum < target[:, None]).sum(axis=1).clip(0, BINS - 1)
+        below = np.where(b > 0, cum[np.arange(len(cum)), b - 1], 0)
+        inside = counts[np.arange(len(counts)), b]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frac = np.where(inside > 0, (target - below) / inside, 0.5)
+        out[:, j] = lo + (b + frac) * width
+    return out
+
+
+@timed
+def simulate_growth(panel, weights, horizon=252, num_paths=DEFAULT_PATHS, method="normal",
+                    seed=None, initial=1.0, percentiles=PERCENTILES, chunk_size=CHUNK_SIZE, workers=None):
+    """
+    Forward Monte Carlo of a portfolio's value over horizon trading days.
+
+    Daily portfolio log returns (weights · asset log returns, as in
+    compute_portfolio) are drawn either from the normal distribution a
+    multivariate normal of the assets implies for that weighted sum
+    ("normal") or by resampling historical days, all assets together
+    ("bootstrap"). Paths are generated chunk_size at a time and folded into
+    fixed-bin histograms per day, so memory does not grow with num_paths.
+    Chunk i always uses the i-th child of SeedSequence(seed), so a seed
+    gives the same result serially or with any number of worker processes.
+
+    With zero volatility (or fewer than two return days) every path is the
+    same, so the bands collapse onto the drift line without simulating and
+    the summary's "Zero Volatility" is True.
+
+    Returns (bands frame of values per day and percentile, summary dict).
+    """
+    panel = as_panel(panel)
+    history = panel.log_returns.to_numpy(dtype=float) @ np.asarray(weights, dtype=float)
+    mean, std = history.mean() if len(history) else 0.0, history.std(ddof=1) if len(history) > 1 else 0.0
+
+    days = np.arange(1, horizon + 1)
+    if not std > ZERO_VOL:
+        return _constant_growth(mean, horizon, num_paths, initial, percentiles)
+    scale = max(std, np.abs(history).max() / SPREAD) if method == "bootstrap" else std
+    lo = days * mean - SPREAD * scale * np.sqrt(days)
+    width = 2 * SPREAD * scale * np.sqrt(days) / BINS
+
+    sizes = [min(chunk_size, num_paths - start) for start in range(0, num_paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(method, mean, std, history, n, horizon, s, lo, width)
+             for n, s in zip(sizes, seeds)]
+
+    counts = np.zeros(horizon * BINS, dtype=np.int64)
+    losses, final_sum = 0, 0.0
+    parallel = workers and workers > 1
+    with ProcessPoolExecutor(max_workers=workers) if parallel else nullcontext() as pool:
+        results = _windowed_map(pool, tasks, 2 * workers) if parallel else map(_chunk_counts, tasks)
+        # merged as they arrive, in chunk order, so the float sum is reproducible too
+        for c, l, f in results:
+            counts += c
+            losses += l
+            final_sum += f
+
+    bands = _percentiles(counts.reshape(horizon, BINS), lo, width, percentiles)
+    bands = pd.DataFrame(
+        initial * np.exp(np.vstack([np.zeros(len(percentiles)), bands])),
+        index=pd.RangeIndex(0, horizon + 1, name="Day"),
+        columns=[f"P{p}" for p in percentiles])
+    summary = {
+        "Paths": num_paths,
+        "Probability of Loss": losses / num_paths,
+        "Median Final Value": float(bands.iloc[-1]["P50"]) if 50 in percentiles else np.nan,
+        "Mean Final Value": initial * final_sum / num_paths,
+        "Zero Volatility": False
+    }
+    return bands, summary
+
+
+def _constant_growth(mean, horizon, num_paths, initial, percentiles):
+    """Bands and summary when every path grows by exactly mean per day (zero-width histogram bins)"""
+    values = initial * np.exp(mean * np.arange(horizon + 1))
+    bands = pd.DataFrame(
+        np.repeat(values[:, None], len(percentiles), axis=1),
+        index=pd.RangeIndex(0, horizon + 1, name="Day"),
+        columns=[f"P{p}" for p in percentiles])
+    summary = {
+        "Paths": num_paths,
+        "Probability of Loss": float(mean < 0),
+        "Median Final Value": values[-1],
+        "Mean Final Value": values[-1],
+        "Zero Volatility": True
+    }
+    return bands, summary
@@ -0,0 +1,189 @@
+import json
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from data import gap_log_returns, drawdown_state, stock_stats_frame
+from price_cache import CACHE_DIR
+
+STATE_FILE = os.path.join(CACHE_DIR, "streaming_stats.json")
+
+
+class StreamingStats:
+    """
+    Running versions of compute_statistics / stock_statistics that absorb new
+    price rows in O(new rows): Welford moments per ticker, a running
+    co-moment matrix for the covariance and running peak/drawdown state.
+    """
+
+    def __init__(self):
+        self.columns = []
+        self.last_date = None
+        self.first_price = np.array([])
+        self.last_price = np.array([])
+        self.days = np.array([], dtype=int)
+        self.count = np.array([], dtype=int)
+        self.mean = np.array([])
+        self.m2 = np.array([])
+        self.cumulative = np.array([])
+        self.peak = np.array([])
+        self.max_drawdown = np.array([])
+        # covariance only uses rows where every column has a return
+        self.cov_count = 0
+        self.cov_mean = np.array([])
+        self.comoment = np.zeros((0, 0))
+
+    @classmethod
+    def from_prices(cls, price_df):
+        return cls().update(price_df)
+
+    def _add_columns(self, new_columns):
+        k = len(new_columns)
+        self.columns = self.columns + list(new_columns)
+        self.first_price = np.append(self.first_price, np.full(k, np.nan))
+        self.last_price = np.append(self.last_price, np.full(k, np.nan))
+        self.days = np.append(self.days, np.zeros(k, dtype=int))
+        self.count = np.append(self.count, np.zeros(k, dtype=int))
+        self.mean = np.append(self.mean, np.zeros(k))
+        self.m2 = np.append(self.m2, np.zeros(k))
+        self.cumulative = np.append(self.cumulative, np.ones(k))
+        self.peak = np.append(self.peak, np.full(k, -np.inf))
+        self.max_drawdown = np.append(self.max_drawdown, np.full(k, np.inf))
+        # earlier rows have no returns for the new tickers, start the covariance over
+        n = len(self.columns)
+        self.cov_count = 0
+        self.cov_mean = np.zeros(n)
+        self.comoment = np.zeros((n, n))
+
+    def update(self, new_rows):
+        """Absorb price rows dated after the last update, returns self"""
+        new_rows = new_rows.sort_index()
+        if self.last_date is not None:
+            new_rows = new_rows[new_rows.index > self.last_date]
+        if new_rows.empty:
+            return self
+        added = [c for c in new_rows.columns if c not in self.columns]
+        if added:
+            self._add_columns(added)
+
+        prices = new_rows.reindex(columns=self.columns).to_numpy(dtype=float)
+        valid = ~np.isnan(prices)
+        seen = valid.any(axis=0)
+        cols = np.arange(len(self.columns))
+
+        fresh = seen & np.isnan(self.first_price)
+        first = valid.argmax(axis=0)
+        self.first_price[fresh] = prices[first[fresh], cols[fresh]]
+
+        # prepend the last known price so the first new row gets its return
+        returns, has_return = gap_log_returns(np.vstack([self.last_price, prices]))
+        returns, has_return = returns[1:], has_return[1:]
+
+        last = prices.shape[0] - 1 - valid[::-1].argmax(axis=0)
+        self.last_price[seen] = prices[last[seen], cols[seen]]
+        self.days += valid.sum(axis=0)
+
+        # Chan et al. merge of the batch moments into the running ones
+        n_new = has_return.sum(axis=0)
+        total = self.count + n_new
+        with np.errstate(divide="ignore", invalid="ignore"):
+            batch_mean = np.nansum(returns, axis=0) / n_new
+            batch_m2 = np.nansum((returns - batch_mean) ** 2, axis=0)
+            delta = batch_mean - self.mean
+            touched = n_new > 0
+            self.mean[touched] += (delta * n_new / total)[touched]
+            self.m2[touched] += (batch_m2 + delta ** 2 * self.count * n_new / total)[touched]
+        self.count = total
+
+        self.cumulative, self.peak, drawdown = drawdown_state(returns, has_return, self.cumulative, self.peak)
+        self.max_drawdown = np.minimum(self.max_drawdown, drawdown)
+
+        complete = returns[has_return.all(axis=1)]
+        if len(complete):
+            n_old, n_new = self.cov_count, len(complete)
+            batch_mean = complete.mean(axis=0)
+            centered = complete - batch_mean
+            delta = batch_mean - self.cov_mean
+            self.cov_count = n_old + n_new
+            self.cov_mean = self.cov_mean + delta * n_new / self.cov_count
+            self.comoment = self.comoment + centered.T @ centered + np.outer(delta, delta) * n_old * n_new / self.cov_count
+
+        self.last_date = new_rows.index[-1]
+        return self
+
+    def volatility(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.count > 1, np.sqrt(self.m2 / (self.count - 1)), np.nan)
+
+    def statistics(self, risk_free_rate=0.06):
+        """Same frame as data.compute_statistics"""
+        avg_return = np.where(self.count > 0, self.mean, np.nan)
+        volatility = self.volatility()
+        stats = pd.DataFrame({
+            "Avg Daily Return": avg_return,
+            "Volatility": volatility,
+            "Sharpe Ratio": (avg_return - risk_free_rate / 252) / volatility
+        }, index=self.columns)
+        return stats.round(4)
+
+    def stock_statistics(self):
+        """Same frame as data.stock_statistics"""
+        seen = self.days > 0
+        return stock_stats_frame(
+            pd.Index(self.columns)[seen],
+            self.first_price[seen],
+            self.last_price[seen],
+            self.days[seen],
+            np.where(self.count > 0, self.mean, np.nan)[seen],
+            self.volatility()[seen],
+            np.where(self.count > 0, self.max_drawdown, np.nan)[seen]
+        )
+
+    def covariance(self):
+        cov = self.comoment / (self.cov_count - 1) if self.cov_count > 1 else np.full_like(self.comoment, np.nan)
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def to_dict(self):
+        return {
+            "columns": self.columns,
+            "last_date": None if self.last_date is None else pd.Timestamp(self.last_date).isoformat(),
+            "first_price": self.first_price.tolist(),
+            "last_price": self.last_price.tolist(),
+            "days": self.days.tolist(),
+            "count": self.count.tolist(),
+            "mean": self.mean.tolist(),
+            "m2": self.m2.tolist(),
+            "cumulative": self.cumulative.tolist(),
+            "peak": self.peak.tolist(),
+            "max_drawdown": self.max_drawdown.tolist(),
+            "cov_count": self.cov_count,
+            "cov_mean": self.cov_mean.tolist(),
+            "comoment": self.comoment.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        stats = cls()
+        stats.columns = list(state["columns"])
+        stats.last_date = None if state["last_date"] is None else pd.Timestamp(state["last_date"])
+        for name in ("first_price", "last_price", "mean", "m2", "cumulative", "peak", "max_drawdown", "cov_mean"):
+            setattr(stats, name, np.array(state[name], dtype=float))
+        stats.days = np.array(state["days"], dtype=int)
+        stats.count = np.array(state["count"], dtype=int)
+        stats.cov_count = state["cov_count"]
+        stats.comoment = np.array(state["comoment"], dtype=float).reshape(len(stats.columns), len(stats.columns))
+        return stats
+
+    def save(self, path=STATE_FILE):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"  # unique per writer, threads included
+        with open(tmp, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=STATE_FILE):
+        with open(path, "r") as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,26 @@
+import numpy as np
+
+from advisor_context import AdvisorContext
+from benchmarks.bench import synthetic_prices
+from data import stock_statistics
+
+
+def _context():
+    prices = synthetic_prices(100, 5)
+    stats = stock_statistics(prices)
+    return AdvisorContext(stats, prices.pct_change().corr(), {"Sharpe Ratio": 1.2}, np.full(5, 0.2),
+                          ("2000-01-03", "2000-05-19", 100)), stats
+
+
+def test_price_questions_get_the_stock_prices():
+    context, stats = _context()
+    order, matched = context.relevant("What was the price trend of the best stock?")
+    assert order[0] == "stocks" and "period" not in matched
+    prompt = context.for_question("What was the price trend of the best stock?")
+    best = stats.sort_values("Sharpe Ratio", ascending=False).iloc[0]
+    assert f'{best["End Price"]:.2f}' in prompt
+
+
+def test_date_questions_still_get_the_period():
+    context, _ = _context()
+    assert context.relevant("Which period do these dates cover?")[0][0] == "period"
@@ -0,0 +1,130 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ai_client import OpenRouterClient, ResponseCache, StreamError
+
+TOKENS = ["Héllo", " wor", "ld", " 🟢"]
+
+
+class SSEHandler(BaseHTTPRequestHandler):
+    """Chunked text/event-stream that sends TOKENS one event at a time"""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        server = self.server
+        if server.status != 200:
+            body = json.dumps({"error": {"message": "upstream down"}}).encode("utf-8")
+            self.send_response(server.status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            self._chunk(b": OPENROUTER PROCESSING\n\n")
+            for i, token in enumerate(TOKENS):
+                event = {"choices": [{"delta": {"content": token}}]}
+                self._chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                if i == 0:
+                    # hold the rest back until the client has seen the first token
+                    server.release.wait(5)
+                if i == 1 and server.fail_with:
+                    self._chunk(f"data: {server.fail_with}\n\n".encode("utf-8"))
+            self._chunk(b"data: [DONE]\n\n")
+            if server.after_done:
+                self._chunk(f"data: {json.dumps({'choices': [{'delta': {'content': server.after_done}}]})}\n\n".encode("utf-8"))
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), SSEHandler)
+    srv.release = threading.Event()
+    srv.after_done = None
+    srv.fail_with = None
+    srv.status = 200
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.release.set()
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def client(server, tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"))
+    return OpenRouterClient("key", url=f"http://127.0.0.1:{server.server_port}/", retries=0, cache=cache)
+
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+def test_tokens_arrive_incrementally_and_done_is_cached(server, client):
+    deltas = []
+    for delta in client.stream_chat(MESSAGES):
+        if not deltas:
+            assert not server.release.is_set()  # received before the server sent the rest
+            server.release.set()
+        deltas.append(delta)
+    assert deltas == TOKENS
+    assert client.cache.get(ResponseCache.key(client.model, MESSAGES)) == "".join(TOKENS)
+    assert list(client.stream_chat(MESSAGES)) == ["".join(TOKENS)]
+
+
+def test_events_after_done_are_ignored(server, client):
+    server.after_done = "late"
+    server.release.set()
+    assert list(client.stream_chat(MESSAGES)) == TOKENS
+
+
+def test_cancel_stops_mid_stream(server, client):
+    cancel = threading.Event()
+    deltas = []
+    for delta in client.stream_chat(MESSAGES, cancel=cancel):
+        deltas.append(delta)
+        cancel.set()
+        server.release.set()
+    assert deltas == TOKENS[:1]
+    assert client.cache.get(ResponseCache.key(client.model, MESSAGES)) is None
+
+
+@pytest.mark.parametrize("event", [
+    json.dumps({"error": {"message": "model overloaded"}}),
+    json.dumps({"choices": []}),
+    json.dumps({"id": "no choices"}),
+    "{not json"
+])
+def test_mid_stream_failure_raises_and_is_not_cached(server, client, event):
+    server.fail_with = event
+    server.release.set()
+    deltas = []
+    with pytest.raises(StreamError):
+        for delta in client.stream_chat(MESSAGES):
+            deltas.append(delta)
+    assert deltas == TOKENS[:2]  # the partial text was streamed but never completed
+    assert client.cache.get(ResponseCache.key(client.model, MESSAGES)) is None
+
+
+def test_http_error_raises(server, client):
+    server.status = 400
+    with pytest.raises(StreamError, match="upstream down"):
+        list(client.stream_chat(MESSAGES))
+    assert client.cache.get(ResponseCache.key(client.model, MESSAGES)) is None
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import backtest
+from benchmarks.bench import synthetic_prices
+
+
+def reference(prices, weights, rebalance, threshold, cost_bps, initial=1.0):
+    """Plain per-day loop over one portfolio"""
+    rate = cost_bps / 10_000
+    p = prices.to_numpy(dtype=float)
+    if rebalance is None:
+        candidate = np.full(len(p), threshold is not None)
+    elif rebalance == "daily":
+        candidate = np.ones(len(p), dtype=bool)
+    else:
+        periods = prices.index.to_period({"monthly": "M", "quarterly": "Q"}[rebalance])
+        candidate = np.r_[False, periods[1:] != periods[:-1]]
+
+    holdings = initial * weights
+    values, rebalances, turnover, costs = [initial], 0, 0.0, 0.0
+    for t in range(1, len(p)):
+        holdings = holdings * p[t] / p[t - 1]
+        value = holdings.sum()
+        event = candidate[t]
+        if event and threshold is not None:
+            event = np.abs(holdings / value - weights).max() > threshold
+        if event:
+            traded = np.abs(value * weights - holdings).sum()
+            rebalances += 1
+            turnover += traded / value
+            costs += rate * traded
+            value -= rate * traded
+            holdings = value * weights
+        values.append(value)
+    return np.array(values), rebalances, turnover, costs
+
+
+@pytest.mark.parametrize("rebalance, threshold", [
+    (None, None), ("daily", None), ("monthly", None), ("quarterly", 0.02), (None, 0.05)
+])
+@pytest.mark.parametrize("cost_bps", [0.0, 25.0])
+def test_matches_per_day_loop(rebalance, threshold, cost_bps):
+    prices = synthetic_prices(400, 4)
+    W = np.random.default_rng(1).dirichlet(np.ones(4), 3)
+    values, summary = backtest(prices, W, rebalance, threshold, cost_bps, initial=100.0, block=17)
+    for k, w in enumerate(W):
+        ref_values, ref_rebalances, ref_turnover, ref_costs = reference(prices, w, rebalance, threshold, cost_bps, 100.0)
+        np.testing.assert_allclose(values.iloc[:, k], ref_values, rtol=1e-12)
+        row = summary.iloc[k]
+        assert row["Rebalances"] == ref_rebalances
+        assert row["Turnover"] == pytest.approx(ref_turnover, rel=1e-10, abs=1e-14)
+        assert row["Costs"] == pytest.approx(ref_costs, rel=1e-10, abs=1e-14)
+
+
+def test_buy_and_hold_never_trades():
+    prices = synthetic_prices(100, 3)
+    _, summary = backtest(prices, [0.5, 0.3, 0.2], cost_bps=50)
+    assert summary[["Rebalances", "Turnover", "Costs"]].eq(0).all().all()
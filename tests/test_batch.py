@@ -0,0 +1,27 @@
+import json
+
+import batch
+
+
+def test_invalid_definitions_are_reported_per_row(tmp_path):
+    path = tmp_path / "portfolios.json"
+    path.write_text(json.dumps([
+        {"name": "ok", "tickers": ["AAA", "BBB"], "start": "2022-01-01", "end": "2023-01-01"},
+        {"name": "no tickers", "tickers": [], "start": "2022-01-01", "end": "2023-01-01"},
+        {"name": "no end", "tickers": ["AAA"], "start": "2022-01-01"},
+        {"name": "bad weights", "tickers": ["AAA"], "weights": [0.5, 0.5], "start": "2022-01-01", "end": "2023-01-01"}
+    ]))
+    definitions = batch.load_definitions(str(path))
+    assert definitions[0]["error"] is None and definitions[0]["weights"] == [0.5, 0.5]
+    assert "no tickers" in definitions[1]["error"]
+    assert "missing end" in definitions[2]["error"]
+    assert "2 weights" in definitions[3]["error"]
+
+    summary, stocks, allocation = batch.analyze(definitions[1])
+    assert summary == {"Portfolio": "no tickers", "Error": definitions[1]["error"]} and stocks is None
+
+
+def test_csv_blank_cells_are_missing(tmp_path):
+    path = tmp_path / "portfolios.csv"
+    path.write_text("name,tickers,weights,start,end\na,AAA;BBB,0.6;0.4,2022-01-01,\n")
+    assert "missing end" in batch.load_definitions(str(path))[0]["error"]
@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from charts import portfolio_chart
+from downsample import reduce_frame
+
+
+@pytest.mark.parametrize("days", [5, 500, 5_000])
+def test_portfolio_chart_renders(days):
+    index = pd.bdate_range("2020-01-01", periods=days, name="Date")
+    returns = pd.Series(np.random.default_rng(0).normal(0, 0.01, days), index=index)
+    fig = portfolio_chart(returns)
+    assert len(fig.data) == 1
+    assert len(fig.data[0].y) == min(days, 2_400)
+
+
+def test_reduce_frame_value_name_may_match_a_column():
+    df = pd.DataFrame({"Price": [1.0, 2.0, 3.0]}, index=pd.Index([0, 1, 2], name="Date"))
+    long_df = reduce_frame(df, 10, value_name="Price", var_name="Company")
+    assert list(long_df.columns) == ["Date", "Company", "Price"]
+    assert long_df["Price"].tolist() == [1.0, 2.0, 3.0]
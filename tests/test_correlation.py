@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench import synthetic_prices
+from correlation import block_average, cluster_order, correlation_matrix, reorder, top_pairs
+
+
+def _returns(n=12):
+    prices = synthetic_prices(300, n)
+    return np.log(prices / prices.shift(1)).dropna()
+
+
+def test_correlation_matches_pandas():
+    returns = _returns()
+    np.testing.assert_allclose(correlation_matrix(returns).to_numpy(), returns.corr().to_numpy(), atol=1e-5)
+    np.testing.assert_allclose(correlation_matrix(returns, np.float64).to_numpy(), returns.corr().to_numpy(), atol=1e-12)
+
+
+def test_flat_series_has_no_correlation():
+    returns = _returns(3).assign(Flat=0.0)
+    corr = correlation_matrix(returns)
+    assert corr["Flat"].drop("Flat").isna().all() and corr.loc["Flat", "Flat"] == 1
+
+
+def test_top_pairs_match_a_full_sort():
+    corr = correlation_matrix(_returns(), np.float64)
+    values = corr.to_numpy()
+    rows, cols = np.triu_indices(len(values), k=1)
+    full = pd.DataFrame({"a": corr.index[rows], "b": corr.columns[cols], "c": values[rows, cols]})
+    for lowest in (False, True):
+        expected = full.sort_values("c", ascending=lowest).head(5)
+        got = top_pairs(corr, 5, lowest=lowest)
+        assert list(zip(got["Company A"], got["Company B"])) == list(zip(expected["a"], expected["b"]))
+
+
+def test_block_average_matches_a_loop():
+    corr = correlation_matrix(_returns(), np.float64)
+    order = cluster_order(corr)
+    assert sorted(order) == list(range(len(corr)))
+    corr = reorder(corr, order)
+    blocks = block_average(corr, 4)
+    groups = np.array_split(np.arange(len(corr)), 4)
+    for i, g in enumerate(groups):
+        for j, h in enumerate(groups):
+            assert np.isclose(blocks.iloc[i, j], corr.to_numpy()[np.ix_(g, h)].mean(), rtol=1e-12)
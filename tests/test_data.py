@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import backtest
+from benchmarks.bench import synthetic_prices
+import data
+from data import evaluate_portfolios
+
+
+def test_final_value_matches_daily_rebalanced_backtest():
+    prices = synthetic_prices(300, 4)
+    weights = np.random.default_rng(0).dirichlet(np.ones(4), 5)
+    result = evaluate_portfolios(prices, weights, chunk_size=2)
+    _, summary = backtest(prices, weights, rebalance="daily")
+    assert np.allclose(result["Final Value (daily rebalanced)"], summary["Final Value"])
+
+
+def test_single_day_gives_nan_growth_metrics():
+    prices = synthetic_prices(1, 3)
+    result = evaluate_portfolios(prices, np.full(3, 1 / 3))
+    assert result[["Max Drawdown", "Final Value (daily rebalanced)"]].isna().all().all()
+
+
+def test_mean_variance_model_is_shared(monkeypatch):
+    mv = data.mean_variance(synthetic_prices(300, 4))
+    assert data.mean_variance(mv) is mv
+    calls = []
+    solve = mv.solve
+    monkeypatch.setattr(mv, "solve", lambda *args, **kwargs: calls.append(1) or solve(*args, **kwargs))
+    data.optimize_portfolio(mv, "min_variance")
+    frontier_df, _ = data.efficient_frontier(mv, points=5)
+    assert len(calls) == 1 + 5  # min variance solved once for both
+    assert len(frontier_df) == 5 and not mv.failures
+
+
+def test_failed_solve_falls_back_to_equal_weights(monkeypatch):
+    monkeypatch.setattr(data, "minimize", lambda *args, **kwargs: SimpleNamespace(
+        success=False, message="Iteration limit reached", x=np.zeros(4)))
+    mv = data.mean_variance(synthetic_prices(300, 4))
+    for objective in ("max_sharpe", "min_variance"):
+        _, weights = data.optimize_portfolio(mv, objective)
+        assert np.allclose(weights, 0.25)
+    frontier_df, _ = data.efficient_frontier(mv, points=5)
+    assert frontier_df.empty and mv.failures[0] == "Iteration limit reached"
+
+
+def _stock_statistics_loop(price_df):
+    """The original per-column implementation"""
+    rows = []
+    for col in price_df.columns:
+        prices = price_df[col].dropna()
+        returns = np.log(prices / prices.shift(1)).dropna()
+        total_return = (prices.iloc[-1] - prices.iloc[0]) / prices.iloc[0]
+        cumulative = (1 + returns).cumprod()
+        rows.append({
+            "Company": col,
+            "Start Price": round(prices.iloc[0], 2),
+            "End Price": round(prices.iloc[-1], 2),
+            "Total Return %": round(total_return * 100, 2),
+            "Annual Return %": round(((1 + total_return) ** (252 / len(prices)) - 1) * 100, 2),
+            "Volatility": round(returns.std(), 4),
+            "Sharpe Ratio": round(returns.mean() / returns.std(), 4),
+            "Max Drawdown %": round((cumulative / cumulative.cummax() - 1).min() * 100, 2),
+            "Days": len(prices)
+        })
+    return pd.DataFrame(rows)
+
+
+def test_stock_statistics_matches_per_column_loop():
+    prices = synthetic_prices(300, 6)
+    prices.iloc[:40, 1] = np.nan    # listed later
+    prices.iloc[100:120, 2] = np.nan  # trading halt
+    prices.iloc[::7, 4] = np.nan    # sparse quotes
+    pd.testing.assert_frame_equal(data.stock_statistics(prices), _stock_statistics_loop(prices),
+                                  check_dtype=False, atol=1e-12)
+
+
+def test_evaluate_portfolios_matches_compute_portfolio_and_pandas_drawdown():
+    prices = synthetic_prices(300, 4)
+    weights = np.random.default_rng(3).dirichlet(np.ones(4), 3)
+    result = evaluate_portfolios(prices, weights)
+    simple = prices.pct_change().dropna()
+    for k, w in enumerate(weights):
+        stats, _ = data.compute_portfolio(prices, w)
+        for name in ("Avg Daily Return", "Volatility", "Sharpe Ratio"):
+            assert result[name].iloc[k] == pytest.approx(stats[name], rel=1e-10)
+        growth = (1 + simple @ w).cumprod()
+        assert result["Max Drawdown"].iloc[k] == pytest.approx((growth / growth.cummax() - 1).min(), rel=1e-12)
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from downsample import lttb_indices, reduce_frame
+
+
+def _lttb_one(x, y, n_out):
+    """Textbook single-series LTTB"""
+    edges = np.linspace(1, len(x) - 1, n_out - 1).astype(int)
+    selected, a = [0], 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i == n_out - 3:
+            avg_x, avg_y = x[-1], y[-1]
+        else:
+            avg_x, avg_y = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        best = -1.0
+        for j in range(lo, hi):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best:
+                best, chosen = area, j
+        selected.append(chosen)
+        a = chosen
+    return selected + [len(x) - 1]
+
+
+def test_vectorized_lttb_matches_single_series_loop():
+    rng = np.random.default_rng(0)
+    x = np.arange(2_000, dtype=float)
+    y = np.cumsum(rng.normal(size=(2_000, 3)), axis=0)
+    rows = lttb_indices(x, y, 150)
+    assert rows.shape == (150, 3)
+    for k in range(3):
+        assert rows[:, k].tolist() == _lttb_one(x, y[:, k], 150)
+
+
+def test_lttb_keeps_extremes_and_order():
+    x = np.arange(1_000, dtype=float)
+    y = np.sin(x / 20)[:, None]
+    y[500] = 10  # a spike must survive downsampling
+    rows = lttb_indices(x, y, 100)[:, 0]
+    assert rows[0] == 0 and rows[-1] == 999 and 500 in rows
+    assert (np.diff(rows) > 0).all()
+
+
+def test_reduce_frame_long_form():
+    index = pd.bdate_range("2020-01-01", periods=1_000, name="Date")
+    df = pd.DataFrame(np.cumsum(np.ones((1_000, 2)), axis=0), index=index, columns=["A", "B"])
+    long_df = reduce_frame(df, 50, value_name="Price", var_name="Company")
+    assert list(long_df.columns) == ["Date", "Company", "Price"]
+    assert long_df.groupby("Company").size().tolist() == [50, 50]
+    for company, rows in long_df.groupby("Company"):
+        assert (rows["Price"].to_numpy() == df.loc[rows["Date"], company].to_numpy()).all()
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+import panel_store
+from benchmarks.bench import synthetic_prices
+
+
+@pytest.fixture
+def fetches(tmp_path, monkeypatch):
+    prices = synthetic_prices(100, 3)
+    calls = []
+
+    def fetch_prices(tickers, start, end):
+        calls.append(list(tickers))
+        out = prices[[t for t in tickers if t in prices.columns]].copy()
+        for t in tickers:
+            if t not in prices.columns:
+                out[t] = np.nan  # the download failed for this ticker
+        return out
+
+    monkeypatch.setattr(panel_store, "PANEL_DIR", str(tmp_path))
+    monkeypatch.setattr(panel_store, "fetch_prices", fetch_prices)
+    return calls
+
+
+def test_complete_historical_panel_is_reused(fetches, monkeypatch):
+    monkeypatch.setattr(panel_store, "REFRESH_SECONDS", -1)
+    tickers = ["Company 0", "Company 1"]
+    first = panel_store.shared_panel(tickers, "2000-01-01", "2000-06-01")
+    second = panel_store.shared_panel(tickers, "2000-01-01", "2000-06-01")
+    assert len(fetches) == 1 and second.equals(first)
+
+
+def test_panel_missing_a_ticker_is_rebuilt_once_stale(fetches, monkeypatch):
+    tickers = ["Company 0", "MISSING"]
+    panel = panel_store.shared_panel(tickers, "2000-01-01", "2000-06-01")
+    assert list(panel.columns) == ["Company 0"]
+    panel_store.shared_panel(tickers, "2000-01-01", "2000-06-01")
+    assert len(fetches) == 1  # still within the refresh window
+    monkeypatch.setattr(panel_store, "REFRESH_SECONDS", -1)
+    panel_store.shared_panel(tickers, "2000-01-01", "2000-06-01")
+    assert len(fetches) == 2
+
+
+def test_selection_order_does_not_change_the_stored_panel(fetches):
+    first = panel_store.shared_panel(["Company 2", "Company 0"], "2000-01-01", "2000-06-01")
+    second = panel_store.shared_panel(["Company 0", "Company 2"], "2000-01-01", "2000-06-01")
+    assert list(first.columns) == list(second.columns) == ["Company 0", "Company 2"]
+    assert len(fetches) == 1
+
+
+def test_select_named_is_a_view_in_any_selection_order():
+    prices = synthetic_prices(50, 4)
+    tickers = list(prices.columns)
+    named = panel_store.select_named(prices, tickers[::-1], ["d", "c", "b", "a"])
+    assert list(named.columns) == ["a", "b", "c", "d"]
+    assert np.shares_memory(named.to_numpy(), prices.to_numpy())
+    assert (named["b"] == prices[tickers[1]]).all()
+
+    shared = panel_store.select_named(prices, [tickers[0], tickers[0]], ["x", "y"])
+    assert (shared["x"] == shared["y"]).all()
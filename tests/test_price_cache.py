@@ -0,0 +1,73 @@
+import threading
+
+import pandas as pd
+import pytest
+
+import price_cache
+from benchmarks.bench import synthetic_prices
+from providers import LocalFileProvider, PriceProvider, normalize_ticker
+
+
+class FakeProvider(PriceProvider):
+    def __init__(self, frames):
+        self.frames = {normalize_ticker(t): f for t, f in frames.items()}
+        self.calls = 0
+        self.requested = []
+
+    def download(self, tickers, start, end, fields=None):
+        self.calls += 1
+        self.requested.extend(tickers)
+        return {t: f.loc[(f.index >= start) & (f.index < end)] for t, f in self.frames.items() if t in tickers}
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(price_cache, "CACHE_DIR", str(tmp_path))
+
+
+def _ohlcv(close):
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1.0})
+
+
+def test_empty_download_is_retried():
+    empty = FakeProvider({})
+    assert price_cache.get_history(["AAA"], "2000-01-01", "2000-06-01", empty)["AAA"].empty
+    full = FakeProvider({"AAA": _ohlcv(synthetic_prices(200, 1).iloc[:, 0])})
+    history = price_cache.get_history(["AAA"], "2000-01-01", "2000-06-01", full)
+    assert full.calls == 1 and len(history["AAA"]) > 0
+
+
+def test_downloaded_range_is_not_fetched_again():
+    provider = FakeProvider({"AAA": _ohlcv(synthetic_prices(200, 1).iloc[:, 0])})
+    first = price_cache.get_history(["AAA"], "2000-01-01", "2000-06-01", provider)
+    second = price_cache.get_history(["AAA"], "2000-01-01", "2000-06-01", provider)
+    assert provider.calls == 1 and second["AAA"].equals(first["AAA"])
+
+
+def test_concurrent_sessions_keep_every_ticker():
+    prices = synthetic_prices(200, 8)
+    provider = FakeProvider({c: _ohlcv(prices[c]) for c in prices.columns})
+    threads = [threading.Thread(target=price_cache.get_history, args=([c], "2000-01-01", "2000-06-01", provider))
+               for c in prices.columns]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert set(price_cache._load_index()) == {normalize_ticker(c) for c in prices.columns}
+
+
+def test_tickers_are_normalized_once_for_cache_and_providers(tmp_path):
+    close = synthetic_prices(200, 1).iloc[:, 0]
+    provider = FakeProvider({"^NSEI": _ohlcv(close)})
+    history = price_cache.get_history(["^nsei ", "^NSEI"], "2000-01-01", "2000-06-01", provider)
+    assert provider.requested == ["^NSEI"]
+    assert set(history) == {"^nsei ", "^NSEI"} and history["^nsei "].equals(history["^NSEI"])
+
+    # the cache file is named the way LocalFileProvider expects it
+    local = LocalFileProvider(price_cache.CACHE_DIR)
+    assert local.download(["^NSEI"], "2000-01-01", "2000-06-01")["^NSEI"]["Close"].equals(history["^NSEI"]["Close"])
+
+
+def test_price_provider_download_is_abstract():
+    with pytest.raises(TypeError):
+        PriceProvider()
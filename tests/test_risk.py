@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+from benchmarks.bench import synthetic_prices
+from risk import risk_report
+
+
+@pytest.mark.parametrize("days", [1, 2, 6, 10])
+def test_short_history_gives_nan_for_long_horizons(days):
+    # days prices -> days - 1 log returns, fewer than the 10-day horizon
+    prices = synthetic_prices(days, 3)
+    report = risk_report(prices, np.full(3, 1 / 3), paths=500)
+    long = report[report["Horizon"] > days - 1]
+    assert long["VaR"].isna().all() and long["ES"].isna().all()
+    short = report[(report["Horizon"] <= days - 1) & (report["Method"] != "parametric")]
+    assert short["VaR"].notna().all()
+
+
+def test_var_below_es():
+    report = risk_report(synthetic_prices(500, 4), np.full(4, 0.25), paths=2_000)
+    assert (report["VaR"] <= report["ES"] + 1e-12).all()
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.bench import synthetic_prices
+from returns_panel import ReturnsPanel
+from rolling import rolling_beta, rolling_correlation, rolling_sharpe, rolling_volatility
+
+WINDOW = 21
+
+
+@pytest.fixture
+def panel():
+    return ReturnsPanel(synthetic_prices(500, 4))
+
+
+def test_volatility_matches_pandas(panel):
+    expected = panel.log_returns.rolling(WINDOW).std()
+    pd.testing.assert_frame_equal(rolling_volatility(panel, WINDOW), expected, rtol=1e-10)
+
+
+def test_sharpe_matches_pandas(panel):
+    returns = panel.log_returns
+    expected = (returns.rolling(WINDOW).mean() - 0.06 / 252) / returns.rolling(WINDOW).std()
+    pd.testing.assert_frame_equal(rolling_sharpe(panel, WINDOW, 0.06), expected, rtol=1e-10)
+
+
+def test_beta_matches_pandas(panel):
+    returns = panel.log_returns
+    bench = returns.mean(axis=1)
+    expected = returns.rolling(WINDOW).cov(bench).div(bench.rolling(WINDOW).var(), axis=0)
+    pd.testing.assert_frame_equal(rolling_beta(panel, bench, WINDOW), expected, rtol=1e-9)
+
+
+def test_correlation_matches_pandas(panel):
+    returns = panel.log_returns
+    result = rolling_correlation(panel, WINDOW)
+    assert len(result.columns) == 6
+    for a, b in [(returns.columns[0], returns.columns[1]), (returns.columns[2], returns.columns[3])]:
+        expected = returns[a].rolling(WINDOW).corr(returns[b])
+        np.testing.assert_allclose(result[f"{a} / {b}"], expected, rtol=1e-9, equal_nan=True)
+
+
+def test_short_history_is_all_nan(panel):
+    assert rolling_volatility(ReturnsPanel(panel.prices.iloc[:10]), WINDOW).isna().all().all()
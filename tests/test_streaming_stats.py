@@ -0,0 +1,70 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.bench import synthetic_prices
+from data import compute_statistics, stock_statistics
+from streaming_stats import StreamingStats
+
+
+@pytest.fixture
+def prices():
+    prices = synthetic_prices(400, 5)
+    prices.iloc[:30, 2] = np.nan  # listed later
+    prices.iloc[100:110, 3] = np.nan  # trading halt
+    return prices
+
+
+def _in_batches(prices, cuts):
+    stats = StreamingStats()
+    for lo, hi in zip([0] + cuts, cuts + [len(prices)]):
+        stats.update(prices.iloc[lo:hi])
+    return stats
+
+
+def test_merged_batches_match_full_sample(prices):
+    # gaps are bridged per ticker, like stock_statistics
+    stats = _in_batches(prices, [1, 50, 105, 399])
+    pd.testing.assert_frame_equal(stats.stock_statistics(), stock_statistics(prices))
+
+
+def test_moments_match_the_panel_on_cleaned_prices():
+    # the app only feeds cleaned (gap-free) prices to compute_statistics and the covariance
+    prices = synthetic_prices(400, 5)
+    stats = _in_batches(prices, [1, 50, 105, 399])
+    pd.testing.assert_frame_equal(stats.statistics(), compute_statistics(prices), check_names=False)
+    returns = np.log(prices / prices.shift(1)).dropna()
+    np.testing.assert_allclose(stats.covariance().to_numpy(), returns.cov().to_numpy(), rtol=1e-10)
+
+
+def test_new_ticker_is_added_midway(prices):
+    stats = _in_batches(prices.iloc[:200, :3], [100])
+    stats.update(prices.iloc[200:])
+    assert stats.columns == list(prices.columns)
+    assert stats.stock_statistics().set_index("Company").loc[prices.columns[4], "Days"] == 200
+
+
+def test_save_load_round_trip(prices, tmp_path):
+    stats = _in_batches(prices, [250])
+    path = str(tmp_path / "state" / "stats.json")
+    stats.save(path)
+    loaded = StreamingStats.load(path)
+    pd.testing.assert_frame_equal(loaded.stock_statistics(), stats.stock_statistics())
+    pd.testing.assert_frame_equal(loaded.covariance(), stats.covariance())
+    # the loaded state keeps absorbing rows like the original
+    pd.testing.assert_frame_equal(loaded.update(prices).statistics(), stats.update(prices).statistics())
+
+
+def test_concurrent_saves_do_not_collide(prices, tmp_path):
+    stats = _in_batches(prices, [250])
+    path = str(tmp_path / "stats.json")
+    threads = [threading.Thread(target=stats.save, args=(path,)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    pd.testing.assert_frame_equal(StreamingStats.load(path).covariance(), stats.covariance())
+    assert os.listdir(tmp_path) == ["stats.json"]
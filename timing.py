@@ -0,0 +1,90 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# Per-rerun stage timings. app.py starts a RerunTimer at the top of every
+# rerun; stage() / @timed record into whichever timer is active in the
+# current context and are close to free when none is. Every finished stage
+# is also emitted as one JSON line on the "perf" logger (file via PERF_LOG).
+logger = logging.getLogger("perf")
+logger.propagate = False
+if os.environ.get("PERF_LOG"):
+    _handler = logging.FileHandler(os.environ["PERF_LOG"])
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+_current = contextvars.ContextVar("rerun_timer", default=None)
+_depth = contextvars.ContextVar("stage_depth", default=0)
+
+
+class RerunTimer:
+    def __init__(self, session_id=None):
+        self.rerun_id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.started = time.perf_counter()
+        self.wall_started = time.time()
+        self.records = []
+        self._lock = threading.Lock()
+
+    def add(self, name, start, end, depth):
+        record = {
+            "session": self.session_id,
+            "rerun": self.rerun_id,
+            "stage": name,
+            "start_ms": round((start - self.started) * 1000, 3),
+            "duration_ms": round((end - start) * 1000, 3),
+            "depth": depth,
+            "thread": threading.current_thread().name,
+            "ts": self.wall_started + (start - self.started)
+        }
+        with self._lock:
+            self.records.append(record)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(record))
+
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+
+def start_rerun(session_id=None):
+    timer = RerunTimer(session_id)
+    _current.set(timer)
+    _depth.set(0)
+    return timer
+
+
+@contextmanager
+def stage(name):
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    depth = _depth.get()
+    token = _depth.set(depth + 1)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        _depth.reset(token)
+        timer.add(name, start, end, depth)
+
+
+def timed(fn):
+    """Record every call of fn as a stage named module.function"""
+    name = f"{fn.__module__}.{fn.__name__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _current.get() is None:
+            return fn(*args, **kwargs)
+        with stage(name):
+            return fn(*args, **kwargs)
+    return wrapper
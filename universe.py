@@ -0,0 +1,96 @@
+import threading
+
+from company_search import CompanyIndex
+from company_store import get_store
+from config import MARKETS
+
+
+class Universe:
+    """
+    Every known company, indexed once: market -> sector -> {name: ticker},
+    name -> ticker and ticker -> [names] (several names may share a ticker).
+    Custom companies without a market/sector show up in every selection.
+    Views per (markets, sectors) selection are memoized until companies
+    are added.
+    """
+
+    def __init__(self, markets=MARKETS):
+        self.by_market = {}
+        self.unassigned = {}
+        self.name_to_ticker = {}
+        self.ticker_to_names = {}
+        self.version = 0
+        self._views = {}
+        self._search_index = None
+        self._lock = threading.RLock()
+        for market, sectors in markets.items():
+            for sector, companies in sectors.items():
+                for name, ticker in companies.items():
+                    self._add(name, ticker, market, sector)
+
+    def _add(self, name, ticker, market, sector):
+        # a re-added company replaces its earlier ticker and placement
+        old = self.name_to_ticker.get(name)
+        if old is not None:
+            self.ticker_to_names[old].remove(name)
+            self.unassigned.pop(name, None)
+            for companies in self.by_market.values():
+                for sector_companies in companies.values():
+                    sector_companies.pop(name, None)
+        self.name_to_ticker[name] = ticker
+        self.ticker_to_names.setdefault(ticker, []).append(name)
+        if market is None and sector is None:
+            self.unassigned[name] = ticker
+        else:
+            self.by_market.setdefault(market, {}).setdefault(sector, {})[name] = ticker
+
+    def add_rows(self, rows, version):
+        """Fold in (name, ticker, market, sector) store rows and drop the memoized views"""
+        with self._lock:
+            for name, ticker, market, sector in rows:
+                self._add(name, ticker, market, sector)
+            self.version = version
+            if rows:
+                self._views = {}
+                self._search_index = None
+
+    def sectors_for(self, markets):
+        with self._lock:
+            return sorted({sector for m in markets for sector in self.by_market.get(m, {})})
+
+    def companies_for(self, markets, sectors):
+        """{name: ticker} for the selected markets and sectors (shared, do not modify)"""
+        key = (frozenset(markets), frozenset(sectors))
+        with self._lock:
+            view = self._views.get(key)
+            if view is None:
+                view = {}
+                for m in markets:
+                    for sector, companies in self.by_market.get(m, {}).items():
+                        if sector in sectors:
+                            view.update(companies)
+                view.update(self.unassigned)
+                self._views[key] = view
+            return view
+
+    def search_index(self):
+        with self._lock:
+            if self._search_index is None:
+                self._search_index = CompanyIndex(self.name_to_ticker)
+            return self._search_index
+
+
+_universe = None
+_universe_lock = threading.Lock()
+
+
+def get_universe():
+    """The process-wide universe, caught up with companies added by any session"""
+    global _universe
+    with _universe_lock:
+        if _universe is None:
+            _universe = Universe()
+        rows, version = get_store().changes_since(_universe.version)
+        if rows:
+            _universe.add_rows(rows, version)
+    return _universe